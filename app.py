@@ -4,26 +4,272 @@ import numpy as np
 import socket
 import platform
 import subprocess
-from flask import Flask, request, jsonify, redirect
+from flask import Flask, Response, request, jsonify, redirect, g, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urlsplit, urlunsplit
 from joblib import load
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import atexit
+import json
+import random
 import traceback
+import threading
+import time
+import hashlib
+import hmac
+import math
+import bisect
+import queue
+from collections import OrderedDict, deque, namedtuple
+import functools
+from concurrent.futures import Future
 import pickle
 import sklearn
+from domain_index import DomainIndex
+from keyword_matcher import KeywordMatcher
+from verdict_store import VerdictStore
+from inference_pool import InferencePool
+from request_profiler import RequestProfiler
+from cascade import Cascade
 from sklearn import __version__ as sklearn_version
+from sklearn.preprocessing import StandardScaler, MinMaxScaler
+from sklearn.linear_model import LogisticRegression
+from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+# Optional faster encoders - plain json is used when they are not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Logging settings - LOG_FORMAT=json gives one structured line per request
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text')
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'DEBUG' if LOG_FORMAT == 'text' else 'INFO').upper()
+LOG_FILE = os.environ.get('LOG_FILE')
+LOG_REQUEST_BODY = os.environ.get('LOG_REQUEST_BODY', '0') == '1'
+LOG_DEBUG_SAMPLE_RATE = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', 1.0 if LOG_FORMAT == 'text' else 0.01))
+
+# One JSON object per line, extra fields passed as extra={'fields': {...}}
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+log_listener = None
+
+def configure_logging():
+    """Route all records through a queue so stream and file I/O happen on a listener thread"""
+    global log_listener
+    if log_listener is not None:
+        log_listener.stop()
+
+    if LOG_FORMAT == 'json':
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handlers = [logging.StreamHandler()]
+    if LOG_FILE:
+        handlers.append(logging.FileHandler(LOG_FILE))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers[:] = [QueueHandler(log_queue)]
+    root.setLevel(LOG_LEVEL)
+    log_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    log_listener.start()
+
+def _restart_logging_after_fork():
+    # The parent's listener thread does not exist in a forked child
+    global log_listener
+    log_listener = None
+    configure_logging()
+
+configure_logging()
+os.register_at_fork(after_in_child=_restart_logging_after_fork)
+atexit.register(lambda: log_listener.stop())
 
-# Configure logging - more detailed format
-logging.basicConfig(level=logging.DEBUG, 
-                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
+access_logger = logging.getLogger('access')
 
 logger.info(f"Starting with scikit-learn version: {sklearn_version}")
 
+# JSON through orjson: same output as the default provider (sorted keys,
+# compact unless debug) at a fraction of the cost
+class OrjsonProvider(DefaultJSONProvider):
+    def _options(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _encode(self, obj, indent=False):
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._options(indent))
+        except TypeError:
+            # Values orjson rejects (e.g. ints beyond 64 bits) go through json
+            if indent:
+                return super().dumps(obj, indent=2).encode()
+            return super().dumps(obj, separators=(',', ':')).encode()
+
+    def dumps(self, obj, **kwargs):
+        return self._encode(obj, bool(kwargs.get('indent'))).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._encode(obj, indent) + b'\n', mimetype=self.mimetype)
+
+FAST_JSON = os.environ.get('FAST_JSON', '1') == '1' and orjson is not None
+
 app = Flask(__name__)
+if FAST_JSON:
+    app.json = OrjsonProvider(app)
 CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True)  # Enable CORS for all routes with more permissive settings
 
+# Latency buckets (seconds) for per-stage histograms, 10us to 1s
+STAGE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+                 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# In-process counters and histograms rendered in Prometheus text format.
+# Recording is a lock, a bisect and a few additions.
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+
+    def describe(self, name, kind, text):
+        self._help[name] = (kind, text)
+
+    def inc(self, name, labels=(), value=1):
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, labels=()):
+        key = (name, labels)
+        index = bisect.bisect_left(STAGE_BUCKETS, seconds)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * (len(STAGE_BUCKETS) + 1), 0.0, 0]
+            histogram[0][index] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+
+    def counter_value(self, name, labels=()):
+        return self._counters.get((name, labels), 0)
+
+    @staticmethod
+    def _labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+    def render(self, gauges=()):
+        """Prometheus text exposition of all metrics plus (name, labels, value) samples read at scrape time"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (list(h[0]), h[1], h[2]) for key, h in self._histograms.items()}
+        lines = []
+        described = set()
+
+        def header(name, default_kind):
+            if name not in described:
+                described.add(name)
+                kind, text = self._help.get(name, (default_kind, name))
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(counters.items()):
+            header(name, 'counter')
+            lines.append(f"{name}{self._labels(labels)} {value}")
+        for (name, labels), (buckets, total, count) in sorted(histograms.items()):
+            header(name, 'histogram')
+            cumulative = 0
+            for bound, bucket_count in zip(STAGE_BUCKETS, buckets):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{self._labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_bucket{self._labels(labels, [('le', '+Inf')])} {count}")
+            lines.append(f"{name}_sum{self._labels(labels)} {total}")
+            lines.append(f"{name}_count{self._labels(labels)} {count}")
+        for name, labels, value in gauges:
+            header(name, 'gauge')
+            lines.append(f"{name}{self._labels(labels)} {value}")
+        return '\n'.join(lines) + '\n'
+
+metrics = Metrics()
+metrics.describe('url_check_stage_seconds', 'histogram', 'Time spent in each stage of a URL check')
+metrics.describe('url_check_answers_total', 'counter', 'URL verdicts by the path that produced them')
+metrics.describe('url_check_coalesced_total', 'counter', 'URL checks answered by waiting on an identical check already in flight')
+metrics.describe('admission_shed_total', 'counter', 'URL checks refused a scoring slot, by reason')
+metrics.describe('admission_overloaded', 'gauge', 'Whether URL checks are being answered degraded because of overload')
+metrics.describe('admission_in_flight', 'gauge', 'URL checks holding a scoring slot')
+metrics.describe('admission_queued', 'gauge', 'URL checks waiting for a scoring slot')
+metrics.describe('model_wrapper_fallbacks_total', 'counter', 'Emergency fallback outputs returned by ModelWrapper')
+metrics.describe('model_loaded', 'gauge', 'Whether the model and scaler are loaded')
+metrics.describe('model_info', 'gauge', 'Active model version and inference engine')
+metrics.describe('model_loaded_timestamp_seconds', 'gauge', 'Unix time the active model was loaded')
+metrics.describe('model_reloads_total', 'counter', 'Model load attempts by result (activated, rejected, failed)')
+metrics.describe('verdict_cache_size', 'gauge', 'Entries in the verdict cache')
+metrics.describe('verdict_cache_hits_total', 'counter', 'Verdict cache hits')
+metrics.describe('verdict_cache_misses_total', 'counter', 'Verdict cache misses')
+metrics.describe('verdict_cache_evictions_total', 'counter', 'Verdict cache LRU evictions')
+metrics.describe('verdict_store_hits_total', 'counter', 'Verdicts served from the persistent store')
+metrics.describe('verdict_store_misses_total', 'counter', 'Persistent verdict store misses')
+metrics.describe('verdict_store_dropped_total', 'counter', 'Verdict store writes dropped under backlog')
+metrics.describe('verdict_store_errors_total', 'counter', 'Persistent verdict store read and write errors')
+metrics.describe('host_cache_size', 'gauge', 'Hostnames in the host feature cache')
+metrics.describe('host_cache_hits_total', 'counter', 'Host feature cache hits')
+metrics.describe('host_cache_misses_total', 'counter', 'Host feature cache misses')
+metrics.describe('process_resident_memory_kb', 'gauge', 'Resident memory of this worker process')
+
+# Label tuples are built once so the hot path does not allocate them
+STAGE_NORMALIZE = (('stage', 'normalize'),)
+STAGE_EXTRACT = (('stage', 'extract_features'),)
+STAGE_SCALER = (('stage', 'scaler_transform'),)
+STAGE_INFERENCE = (('stage', 'inference'),)
+STAGE_EXTRACT_BATCH = (('stage', 'extract_features_batch'),)
+STAGE_INFERENCE_BATCH = (('stage', 'inference_batch'),)
+STAGE_HEURISTIC = (('stage', 'heuristic'),)
+STAGE_KEYWORDS = (('stage', 'keywords'),)
+STAGE_CASCADE = (('stage', 'cascade'),)
+STAGE_SERIALIZE = (('stage', 'serialize'),)
+PATH_MODEL = (('path', 'model'),)
+PATH_CACHE = (('path', 'cache'),)
+PATH_MODEL_ERROR = (('path', 'model_error'),)
+PATH_FALLBACK = (('path', 'fallback'),)
+PATH_ERROR = (('path', 'error'),)
+PATH_DOMAIN_LIST = (('path', 'domain_list'),)
+PATH_CASCADE = (('path', 'cascade'),)
+PATH_STORE = (('path', 'store'),)
+PATH_NOT_MODIFIED = (('path', 'not_modified'),)
+PATH_DEGRADED = (('path', 'degraded'),)
+
 # Get server network info for debugging
 def get_network_info():
     hostname = socket.gethostname()
@@ -46,8 +292,55 @@ def get_network_info():
         "platform": platform.platform()
     }
 
+# Network/platform snapshot - DNS lookups and platform probing are slow, so
+# request handlers read a cached copy that is refreshed in the background
+class NetworkSnapshot:
+    def __init__(self, max_age):
+        self.max_age = max_age
+        self.info = self._collect()
+        self.taken_at = time.time()
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def _collect(self):
+        try:
+            return get_network_info()
+        except Exception as e:
+            logger.error(f"Error collecting network info: {e}")
+            return {
+                "hostname": socket.gethostname(),
+                "local_ip": None,
+                "all_ips": [],
+                "platform": platform.platform(),
+                "error": str(e)
+            }
+
+    def _refresh(self):
+        try:
+            self.info = self._collect()
+            self.taken_at = time.time()
+        finally:
+            self._refreshing = False
+
+    def refresh_if_stale(self):
+        """Start a background refresh when the snapshot is older than max_age"""
+        if time.time() - self.taken_at < self.max_age:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh, name='network-snapshot', daemon=True).start()
+
+    def age(self):
+        return time.time() - self.taken_at
+
+# Seconds before /api/diagnostics triggers a background refresh of the snapshot
+NETWORK_INFO_MAX_AGE = float(os.environ.get('NETWORK_INFO_MAX_AGE', 300))
+
 # Print network info at startup
-network_info = get_network_info()
+network_snapshot = NetworkSnapshot(NETWORK_INFO_MAX_AGE)
+network_info = network_snapshot.info
 logger.info(f"Server starting with network configuration:")
 logger.info(f"Hostname: {network_info['hostname']}")
 logger.info(f"Local IP: {network_info['local_ip']}")
@@ -71,10 +364,12 @@ class ModelWrapper:
             # Fallback based on probabilities
             try:
                 probs = self.model.predict_proba(X)
+                metrics.inc('model_wrapper_fallbacks_total', (('kind', 'predict_argmax'),))
                 return np.argmax(probs, axis=1)
             except Exception as e2:
                 logger.error(f"Error with fallback prediction: {e2}")
                 # Emergency fallback - predict safe
+                metrics.inc('model_wrapper_fallbacks_total', (('kind', 'predict_zeros'),))
                 return np.zeros(X.shape[0], dtype=int)
     
     def predict_proba(self, X):
@@ -83,91 +378,936 @@ class ModelWrapper:
         except Exception as e:
             logger.error(f"Error with model.predict_proba: {e}")
             # Emergency fallback - return [0.8, 0.2] for each input
+            metrics.inc('model_wrapper_fallbacks_total', (('kind', 'predict_proba_default'),))
             return np.array([[0.8, 0.2]] * X.shape[0])
 
-# Load the model and scaler
-model = None
-scaler = None
+# Reference inference path: scaler.transform followed by ModelWrapper.predict_proba
+class SklearnInference:
+    name = 'sklearn'
+
+    def __init__(self, scaler, model):
+        self.scaler = scaler
+        self.model = model
+        self.classes = np.asarray(getattr(model.model, 'classes_', [0, 1]))
+
+    def predict_proba(self, X):
+        try:
+            start = time.perf_counter()
+            X_scaled = self.scaler.transform(X)
+            metrics.observe('url_check_stage_seconds', time.perf_counter() - start, STAGE_SCALER)
+        except Exception as e:
+            logger.error(f"Error scaling features: {e}")
+            # Fall back to unscaled features like the original request path
+            X_scaled = X
+        return self.model.predict_proba(X_scaled)
+
+# Fitted scaler and estimator exported to plain NumPy arrays, so a prediction
+# is a handful of array operations with no per-call sklearn validation
+class NumpyInference:
+    name = 'numpy'
+
+    def __init__(self, scaler, estimator):
+        self.classes = np.asarray(estimator.classes_)
+        self.n_features = scaler.n_features_in_
+
+        # Affine input stage, applied with the same operations as the scaler so
+        # tree inputs round identically; also kept as X * slope + intercept
+        if isinstance(scaler, StandardScaler):
+            self.mean = scaler.mean_ if scaler.with_mean else np.zeros(self.n_features)
+            self.scale = scaler.scale_ if scaler.with_std else np.ones(self.n_features)
+            self._scale_input = self._standard_scale
+            slope = 1.0 / self.scale
+            intercept = -self.mean / self.scale
+        elif isinstance(scaler, MinMaxScaler) and not scaler.clip:
+            self.scale = scaler.scale_
+            self.min = scaler.min_
+            self._scale_input = self._min_max_scale
+            slope = self.scale
+            intercept = self.min
+        else:
+            raise TypeError(f"Unsupported scaler for NumPy export: {type(scaler).__name__}")
+
+        if isinstance(estimator, LogisticRegression) and len(self.classes) == 2:
+            # Fold the scaler into the weights: w.(a*x + c) + b = (w*a).x + (b + w.c)
+            coef = estimator.coef_.ravel()
+            self.weights = coef * slope
+            self.bias = float(estimator.intercept_[0] + np.dot(coef, intercept))
+            self._predict = self._predict_linear
+        elif isinstance(estimator, (RandomForestClassifier, ExtraTreesClassifier, DecisionTreeClassifier)):
+            trees = estimator.estimators_ if hasattr(estimator, 'estimators_') else [estimator]
+            self._export_trees([t.tree_ for t in trees])
+            self._predict = self._predict_trees
+        else:
+            raise TypeError(f"Unsupported estimator for NumPy export: {type(estimator).__name__}")
+
+    def _export_trees(self, trees):
+        """Flatten every tree into shared node arrays so all trees walk together"""
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        base = 0
+        for tree in trees:
+            if tree.n_outputs != 1:
+                raise TypeError("Multi-output trees are not supported for NumPy export")
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+            # Leaves point at themselves so extra iterations are no-ops
+            lefts.append(np.where(is_leaf, nodes, tree.children_left) + base)
+            rights.append(np.where(is_leaf, nodes, tree.children_right) + base)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            value = tree.value[:, 0, :].astype(float)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+            roots.append(base)
+            base += tree.node_count
+        self.feature = np.concatenate(features)
+        self.threshold = np.concatenate(thresholds)
+        self.left = np.concatenate(lefts)
+        self.right = np.concatenate(rights)
+        self.value = np.concatenate(values)
+        self.roots = np.array(roots)
+        self.max_depth = max(tree.max_depth for tree in trees)
+
+    def _standard_scale(self, X):
+        return (X - self.mean) / self.scale
+
+    def _min_max_scale(self, X):
+        return X * self.scale + self.min
+
+    def _predict_linear(self, X):
+        decision = X @ self.weights + self.bias
+        positive = 1.0 / (1.0 + np.exp(-decision))
+        return np.stack([1 - positive, positive], axis=1)
+
+    def _predict_trees(self, X):
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X_scaled = self._scale_input(X).astype(np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.tile(self.roots, (X.shape[0], 1))
+        for _ in range(self.max_depth):
+            go_left = X_scaled[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        # Summing over the tree axis adds trees in order, as the forest does
+        return self.value[nodes].sum(axis=1) / len(self.roots)
+
+    def export_arrays(self, directory):
+        """Write every array of the evaluator to <directory>/<name>.npy"""
+        os.makedirs(directory, exist_ok=True)
+        for name, value in vars(self).items():
+            if isinstance(value, np.ndarray):
+                # Write under a temporary name so concurrent workers never read a partial file
+                tmp_path = os.path.join(directory, f".{name}.{os.getpid()}.npy")
+                np.save(tmp_path, value)
+                os.replace(tmp_path, os.path.join(directory, f"{name}.npy"))
+
+    def map_arrays(self, directory):
+        """Swap in read-only memory-mapped copies of the exported arrays"""
+        for name, value in list(vars(self).items()):
+            if isinstance(value, np.ndarray):
+                setattr(self, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r'))
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=float)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected input of shape (n, {self.n_features}), got {X.shape}")
+        return self._predict(X)
+
+# NumPy evaluator with the sklearn path behind it for anything it cannot handle
+class FusedInference:
+    name = 'numpy'
+
+    def __init__(self, fast, reference):
+        self.fast = fast
+        self.reference = reference
+        self.classes = fast.classes
+
+    def predict_proba(self, X):
+        try:
+            return self.fast.predict_proba(X)
+        except Exception as e:
+            logger.error(f"Error in NumPy inference, using sklearn path: {e}")
+            return self.reference.predict_proba(X)
+
+def check_engine_parity(fast, reference, X, tolerance=1e-9):
+    """Largest probability difference between two engines, or None if labels disagree"""
+    fast_probs = fast.predict_proba(X)
+    reference_probs = reference.predict_proba(X)
+    if not np.array_equal(fast_probs.argmax(axis=1), reference_probs.argmax(axis=1)):
+        return None
+    return float(np.max(np.abs(fast_probs - reference_probs)))
 
+# URLs used to validate an exported engine against the joblib model
+PARITY_URLS = [
+    'https://google.com',
+    'https://www.github.com/user/repo/blob/main/README.md',
+    'http://192.168.1.10/login.php?user=admin&pass=1234',
+    'https://secure-update.account-verify.example.xyz/~signin/%20bank?id=99',
+    'http://free-prize-winner.com//redirect?to=http://evil.example/path',
+    'https://docs.python.org/3/library/re.html#re.compile',
+    'https://a.b.c.d.e.example.co.uk/a_b-c;d,e$f*g|h',
+    'https://x.io',
+]
+
+def build_inference_engine(scaler, model):
+    """Export scaler+model to NumPy when possible and it matches the joblib model"""
+    reference = SklearnInference(scaler, model)
+    try:
+        fast = NumpyInference(scaler, model.model)
+    except Exception as e:
+        logger.info(f"Using sklearn inference path: {e}")
+        return reference
+
+    probe = extract_features_batch(PARITY_URLS)
+    # Add jittered rows so thresholds away from the probe URLs are exercised too
+    rng = np.random.default_rng(0)
+    probe = np.vstack([probe, probe * rng.uniform(0.5, 2.0, size=probe.shape)])
+    try:
+        difference = check_engine_parity(fast, reference, probe)
+    except Exception as e:
+        logger.warning(f"NumPy inference parity check failed, using sklearn path: {e}")
+        return reference
+    if difference is None or difference > 1e-9:
+        logger.warning(f"NumPy inference does not match the joblib model (max diff {difference}), using sklearn path")
+        return reference
+
+    logger.info(f"Using NumPy inference engine (max parity diff {difference:.2e})")
+    return FusedInference(fast, reference)
+
+# Bounded LRU cache of model verdicts with per-entry expiry
+class VerdictCache:
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        if self.max_size <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, verdict = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return verdict
+
+    def put(self, key, verdict, version):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            # Drop verdicts computed by a model that has since been replaced
+            if version != self.version:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, verdict)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def set_version(self, version):
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.max_size > 0,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+def normalize_url(url):
+    """Cache key for a URL, and the form that is scored: default https scheme, lowercase host, no trailing slash"""
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    netloc = parts.netloc
+    if '@' in netloc:
+        userinfo, _, host = netloc.rpartition('@')
+        netloc = userinfo + '@' + host.lower()
+    else:
+        netloc = netloc.lower()
+    return urlunsplit((parts.scheme.lower(), netloc, parts.path.rstrip('/'), parts.query, parts.fragment))
+
+def artifact_version(*paths):
+    """Short fingerprint of model artifacts, changes whenever a file is replaced"""
+    digest = hashlib.sha1()
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:12]
+
+# Upper bound on URLs accepted by the batch endpoint in one request
+MAX_BATCH_URLS = int(os.environ.get('MAX_BATCH_URLS', 10000))
+
+# Verdict cache settings - set VERDICT_CACHE_SIZE=0 to disable
+VERDICT_CACHE_SIZE = int(os.environ.get('VERDICT_CACHE_SIZE', 10000))
+VERDICT_CACHE_TTL = float(os.environ.get('VERDICT_CACHE_TTL', 3600))
+verdict_cache = VerdictCache(VERDICT_CACHE_SIZE, VERDICT_CACHE_TTL)
+
+# Domain allowlist/blocklist - text files with one domain per line, or
+# indexes compiled with domain_index.py. Listed hosts skip the model.
+ALLOWLIST_FILE = os.environ.get('ALLOWLIST_FILE')
+BLOCKLIST_FILE = os.environ.get('BLOCKLIST_FILE')
+
+def load_domain_index(path, kind):
+    if not path:
+        return DomainIndex()
+    try:
+        index = DomainIndex.from_file(path)
+        logger.info(f"Loaded {kind} with {len(index)} domains from {path}")
+        return index
+    except Exception as e:
+        logger.error(f"Error loading {kind} from {path}: {e}")
+        return DomainIndex()
+
+allowlist = load_domain_index(ALLOWLIST_FILE, 'allowlist')
+blocklist = load_domain_index(BLOCKLIST_FILE, 'blocklist')
+
+# Well-known domains the heuristic fallback treats as trusted
+COMMON_SAFE_DOMAINS = DomainIndex.from_domains([
+    'google.com', 'microsoft.com', 'apple.com', 'amazon.com',
+    'facebook.com', 'twitter.com', 'instagram.com', 'linkedin.com',
+    'youtube.com', 'github.com', 'stackoverflow.com', 'wikipedia.org'
+])
+
+# Suspicious keyword dictionary - SUSPICIOUS_KEYWORDS_FILE replaces the
+# built-in words with one word per line, matched in a single pass per URL
+SUSPICIOUS_KEYWORDS_FILE = os.environ.get('SUSPICIOUS_KEYWORDS_FILE')
+DEFAULT_SUSPICIOUS_KEYWORDS = ['free', 'win', 'lucky', 'prize', 'money', 'loan', 'password', 'login', 'bank']
+
+def load_keyword_matcher(path):
+    if path:
+        try:
+            matcher = KeywordMatcher.from_file(path)
+            logger.info(f"Loaded {len(matcher)} suspicious keywords from {path}")
+            return matcher
+        except Exception as e:
+            logger.error(f"Error loading suspicious keywords from {path}, using defaults: {e}")
+    return KeywordMatcher(DEFAULT_SUSPICIOUS_KEYWORDS)
+
+keyword_matcher = load_keyword_matcher(SUSPICIOUS_KEYWORDS_FILE)
+
+# Fingerprint of the list files that shape verdicts besides the model, part of every ETag
 try:
-    MODEL_PATH = os.path.join(current_dir, 'Malicious-URL-Detection', 'url_classifier_model.joblib')
-    SCALER_PATH = os.path.join(current_dir, 'Malicious-URL-Detection', 'scaler.joblib')
-    
-    logger.info(f"Loading model from: {MODEL_PATH}")
-    logger.info(f"Loading scaler from: {SCALER_PATH}")
-    
+    VERDICT_INPUTS_VERSION = artifact_version(*[path for path in (ALLOWLIST_FILE, BLOCKLIST_FILE, SUSPICIOUS_KEYWORDS_FILE) if path])
+except OSError:
+    VERDICT_INPUTS_VERSION = 'unversioned'
+
+# Persistent verdict store shared by all workers and restarts - set
+# VERDICT_STORE_PATH to a SQLite file on local disk to enable
+VERDICT_STORE_PATH = os.environ.get('VERDICT_STORE_PATH')
+VERDICT_STORE_TTL = float(os.environ.get('VERDICT_STORE_TTL', 7 * 86400))
+VERDICT_STORE_MAX_ROWS = int(os.environ.get('VERDICT_STORE_MAX_ROWS', 1000000))
+VERDICT_STORE_WARM = int(os.environ.get('VERDICT_STORE_WARM', VERDICT_CACHE_SIZE))
+
+def open_verdict_store(path):
+    if not path:
+        return None
+    try:
+        store = VerdictStore(path, VERDICT_STORE_TTL, VERDICT_STORE_MAX_ROWS)
+        atexit.register(store.flush)
+        logger.info(f"Using verdict store at {path}")
+        return store
+    except Exception as e:
+        logger.error(f"Error opening verdict store {path}, continuing without it: {e}")
+        return None
+
+verdict_store = open_verdict_store(VERDICT_STORE_PATH)
+
+def store_version(version):
+    """Store key version: stored verdicts also depend on the domain and keyword lists"""
+    return f"{version}:{VERDICT_INPUTS_VERSION}"
+
+def warm_verdict_cache(version):
+    """Load the most requested stored verdicts of a verdict version into the verdict cache"""
+    if verdict_store is None or VERDICT_STORE_WARM <= 0 or VERDICT_CACHE_SIZE <= 0:
+        return
+    start = time.perf_counter()
+    try:
+        hot = verdict_store.hot(store_version(version), min(VERDICT_STORE_WARM, VERDICT_CACHE_SIZE))
+    except Exception as e:
+        logger.error(f"Error warming the verdict cache: {e}")
+        return
+    # Hottest last, so they are the most recently used entries of the LRU
+    for key, verdict in reversed(hot):
+        verdict_cache.put(key, verdict, version)
+    logger.info(f"Warmed verdict cache with {len(hot)} stored verdicts in {time.perf_counter() - start:.2f}s")
+
+def domain_list_verdict(url, hostname=None):
+    """Verdict for a host on the blocklist or allowlist, or None when it is not listed"""
+    if not len(blocklist) and not len(allowlist):
+        return None
+    if hostname is None:
+        try:
+            hostname = urlsplit(url).hostname or ''
+        except ValueError:
+            return None
+
+    host = host_info(hostname)
+    listed = host.blocklisted
+    if listed:
+        return {
+            "url": url,
+            "is_safe": False,
+            "confidence": 1.0,
+            "details": f"This domain ({listed}) is on the blocklist of known malicious sites."
+        }
+    listed = host.allowlisted
+    if listed:
+        return {
+            "url": url,
+            "is_safe": True,
+            "confidence": 1.0,
+            "details": f"This domain ({listed}) is on the allowlist of trusted sites."
+        }
+    return None
+
+# MODEL_MMAP=1 memory-maps model arrays so workers share them through the page cache
+MODEL_MMAP = os.environ.get('MODEL_MMAP', '0') == '1'
+ENGINE_CACHE_DIR = os.environ.get('ENGINE_CACHE_DIR', os.path.join(current_dir, 'Malicious-URL-Detection', 'engine_cache'))
+
+def process_memory(proportional=False):
+    """Resident memory of this process in KB, split into private and shared where the OS reports it"""
+    memory = {"pid": os.getpid()}
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in ('VmRSS', 'RssAnon', 'RssFile', 'RssShmem'):
+                    memory[key.lower() + '_kb'] = int(value.split()[0])
+    except OSError:
+        import resource
+        memory['max_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return memory
+    if proportional:
+        # Proportional set size counts shared pages once across all processes.
+        # smaps_rollup walks every mapping (about 1.5 ms), so only diagnostics ask
+        try:
+            with open('/proc/self/smaps_rollup') as f:
+                for line in f:
+                    if line.startswith('Pss:'):
+                        memory['pss_kb'] = int(line.split()[1])
+        except OSError:
+            pass
+    return memory
+
+# Model artifacts - watched for changes and reloaded without a restart
+MODEL_PATH = os.path.join(current_dir, 'Malicious-URL-Detection', 'url_classifier_model.joblib')
+SCALER_PATH = os.path.join(current_dir, 'Malicious-URL-Detection', 'scaler.joblib')
+MODEL_WATCH_INTERVAL = float(os.environ.get('MODEL_WATCH_INTERVAL', 30))
+MODEL_CANARY_FILE = os.environ.get('MODEL_CANARY_FILE')
+MODEL_CANARY_MIN_AGREEMENT = float(os.environ.get('MODEL_CANARY_MIN_AGREEMENT', 0.8))
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+# Inference cascade - a cheap scorer built by cascade.py answers confident
+# URLs before the full model. Thresholds default to the ones it was built with.
+CASCADE_ENABLED = os.environ.get('CASCADE_ENABLED', '1') == '1'
+CASCADE_FILE = os.environ.get('CASCADE_FILE', os.path.join(current_dir, 'Malicious-URL-Detection', 'cascade.joblib'))
+CASCADE_SAFE_THRESHOLD = os.environ.get('CASCADE_SAFE_THRESHOLD')
+CASCADE_MALICIOUS_THRESHOLD = os.environ.get('CASCADE_MALICIOUS_THRESHOLD')
+
+def load_model_artifacts(model_path, scaler_path):
+    """Load the joblib model and scaler, falling back to plain pickle"""
+    logger.info(f"Loading model from: {model_path}")
+    logger.info(f"Loading scaler from: {scaler_path}")
+
     # Check if files exist
-    if not os.path.exists(MODEL_PATH):
-        logger.error(f"Model file doesn't exist: {MODEL_PATH}")
-    if not os.path.exists(SCALER_PATH):
-        logger.error(f"Scaler file doesn't exist: {SCALER_PATH}")
-    
+    if not os.path.exists(model_path):
+        logger.error(f"Model file doesn't exist: {model_path}")
+    if not os.path.exists(scaler_path):
+        logger.error(f"Scaler file doesn't exist: {scaler_path}")
+
     # Try multiple loading methods
     try:
         # Method 1: Standard joblib load
-        model = load(MODEL_PATH)
-        scaler = load(SCALER_PATH)
-        logger.info("Model and scaler loaded successfully with joblib")
+        mmap_mode = 'r' if MODEL_MMAP else None
+        model = load(model_path, mmap_mode=mmap_mode)
+        scaler = load(scaler_path, mmap_mode=mmap_mode)
+        logger.info(f"Model and scaler loaded successfully with joblib (mmap_mode={mmap_mode})")
     except Exception as e:
         logger.warning(f"Failed to load with joblib: {e}")
         try:
             # Method 2: Try with pickle
-            with open(MODEL_PATH, 'rb') as f:
+            with open(model_path, 'rb') as f:
                 model = pickle.load(f)
-            with open(SCALER_PATH, 'rb') as f:
+            with open(scaler_path, 'rb') as f:
                 scaler = pickle.load(f)
             logger.info("Model and scaler loaded successfully with pickle")
         except Exception as e2:
             logger.error(f"Failed to load with pickle too: {e2}")
             raise
-            
+
     # Log model type
     logger.info(f"Model type: {type(model)}")
     logger.info(f"Scaler type: {type(scaler)}")
-    
+
     # Wrap model for compatibility
-    if model is not None:
-        model = ModelWrapper(model)
-        logger.info("Model wrapped for version compatibility")
-    
-except Exception as e:
-    logger.error(f"Error loading model or scaler: {e}")
-    logger.error(traceback.format_exc())
-    model = None
-    scaler = None
+    model = ModelWrapper(model)
+    logger.info("Model wrapped for version compatibility")
+    return model, scaler
+
+# A loaded model, its scaler and serving engine. Requests read the active
+# bundle once and use it throughout, so a reload never mixes two models.
+class ModelBundle:
+    def __init__(self, model, scaler, engine, version, cascade=None):
+        self.model = model
+        self.scaler = scaler
+        self.engine = engine
+        self.version = version
+        self.cascade = cascade
+        # Keys cached, stored and ETag-validated verdicts: cascade answers
+        # change with the cascade file and thresholds, not only the model
+        self.verdict_version = f"{version}:{cascade.fingerprint() if cascade is not None else 'nocascade'}"
+        self.loaded_at = time.time()
+
+def load_cascade(version):
+    """Cheap scorer built for this model version, or None"""
+    if not CASCADE_ENABLED or not os.path.exists(CASCADE_FILE):
+        return None
+    try:
+        cascade = Cascade.load(CASCADE_FILE)
+    except Exception as e:
+        logger.error(f"Could not load cascade from {CASCADE_FILE}: {e}")
+        return None
+    if cascade.model_version != version:
+        logger.warning(f"Ignoring cascade built for model {cascade.model_version}, active model is {version}; rebuild it with cascade.py")
+        return None
+    if CASCADE_SAFE_THRESHOLD is not None:
+        cascade.safe_threshold = float(CASCADE_SAFE_THRESHOLD)
+    if CASCADE_MALICIOUS_THRESHOLD is not None:
+        cascade.malicious_threshold = float(CASCADE_MALICIOUS_THRESHOLD)
+    logger.info(f"Cascade enabled (safe below {cascade.safe_threshold:.4f}, malicious above {cascade.malicious_threshold:.4f})")
+    return cascade
+
+def build_model_bundle(model_path, scaler_path):
+    # Fingerprint before loading: a file replaced mid-load changes the
+    # version again and is picked up by the next check
+    version = artifact_version(model_path, scaler_path)
+    model, scaler = load_model_artifacts(model_path, scaler_path)
+    try:
+        engine = build_inference_engine(scaler, model)
+    except Exception as e:
+        logger.error(f"Error building inference engine: {e}")
+        engine = SklearnInference(scaler, model)
+
+    # Serve the exported arrays from flat .npy files mapped into every worker
+    if MODEL_MMAP and isinstance(engine, FusedInference):
+        engine_dir = os.path.join(ENGINE_CACHE_DIR, version)
+        try:
+            try:
+                engine.fast.map_arrays(engine_dir)
+            except FileNotFoundError:
+                engine.fast.export_arrays(engine_dir)
+                engine.fast.map_arrays(engine_dir)
+            logger.info(f"Inference engine arrays memory-mapped from {engine_dir}")
+        except Exception as e:
+            logger.warning(f"Could not memory-map inference engine arrays, keeping them in memory: {e}")
+    return ModelBundle(model, scaler, engine, version, load_cascade(version))
+
+def load_canary_urls(path):
+    if not path:
+        return PARITY_URLS
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            urls = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        logger.info(f"Loaded {len(urls)} canary URLs from {path}")
+        return urls or PARITY_URLS
+    except OSError as e:
+        logger.error(f"Could not read canary URLs from {path}, using built-in set: {e}")
+        return PARITY_URLS
+
+def validate_bundle(candidate, current, canary_urls, min_agreement):
+    """Return a reason to reject the candidate bundle, or None if it is safe to serve"""
+    features = extract_features_batch(canary_urls)
+    probabilities = candidate.engine.predict_proba(features)
+    if probabilities.shape != (len(canary_urls), 2):
+        return f"unexpected probability shape {probabilities.shape}"
+    if not np.all(np.isfinite(probabilities)) or probabilities.min() < 0 or probabilities.max() > 1:
+        return "probabilities outside [0, 1]"
+    if not np.allclose(probabilities.sum(axis=1), 1.0, atol=1e-6):
+        return "probabilities do not sum to 1"
+    if set(np.asarray(candidate.engine.classes).tolist()) != {0, 1}:
+        return f"unexpected classes {list(candidate.engine.classes)}"
+    if current is not None:
+        labels = candidate.engine.classes[np.argmax(probabilities, axis=1)]
+        current_labels = current.engine.classes[np.argmax(current.engine.predict_proba(features), axis=1)]
+        agreement = float(np.mean(labels == current_labels))
+        if agreement < min_agreement:
+            return f"agrees with the active model on {agreement:.0%} of canary URLs (minimum {min_agreement:.0%})"
+    return None
+
+# Holds the active ModelBundle. Reloads load and validate a new bundle in the
+# background and then replace self.active with one assignment, so readers
+# never take a lock and always see either the old or the new bundle whole.
+class ModelRegistry:
+    def __init__(self, model_path, scaler_path, watch_interval, canary_urls, min_agreement):
+        self.model_path = model_path
+        self.scaler_path = scaler_path
+        self.watch_interval = watch_interval
+        self.canary_urls = canary_urls
+        self.min_agreement = min_agreement
+        self.active = None
+        self.history = deque(maxlen=20)
+        self._reload_lock = threading.Lock()
+        self._rejected_version = None
+        self._watcher = None
+        self._pid = None
+
+    def load_initial(self):
+        try:
+            self._activate(build_model_bundle(self.model_path, self.scaler_path), 'startup')
+        except Exception as e:
+            logger.error(f"Error loading model or scaler: {e}")
+            logger.error(traceback.format_exc())
+            self._record('startup', 'failed', None, str(e))
+
+    def reload(self, reason='manual', force=False):
+        """Load, validate and activate the current artifacts, returning the outcome"""
+        with self._reload_lock:
+            current = self.active
+            try:
+                version = artifact_version(self.model_path, self.scaler_path)
+            except OSError as e:
+                return self._record(reason, 'failed', None, str(e))
+            if not force and current is not None and version == current.version:
+                return {"result": "unchanged", "version": version}
+
+            logger.info(f"Reloading model ({reason}), candidate version {version}")
+            try:
+                candidate = build_model_bundle(self.model_path, self.scaler_path)
+                problem = validate_bundle(candidate, current, self.canary_urls, self.min_agreement)
+            except Exception as e:
+                logger.error(traceback.format_exc())
+                problem = f"load failed: {e}"
+            if problem:
+                self._rejected_version = version
+                logger.error(f"Rejected model version {version}: {problem}")
+                return self._record(reason, 'rejected', version, problem)
+            return self._activate(candidate, reason)
+
+    def reload_async(self, reason='manual', force=False):
+        thread = threading.Thread(target=self.reload, args=(reason, force), name='model-reload', daemon=True)
+        thread.start()
+        return thread
+
+    def _activate(self, bundle, reason):
+        previous = self.active
+        self.active = bundle
+        # Cached verdicts are only valid for the model and cascade that produced them
+        verdict_cache.set_version(bundle.verdict_version)
+        warm_verdict_cache(bundle.verdict_version)
+        logger.info(f"Model version {bundle.version} active (engine {bundle.engine.name})")
+        return self._record(reason, 'activated', bundle.version, None,
+                            previous.version if previous is not None else None)
+
+    def _record(self, reason, result, version, error=None, previous_version=None):
+        metrics.inc('model_reloads_total', (('result', result),))
+        entry = {"time": time.time(), "reason": reason, "result": result, "version": version}
+        if previous_version is not None:
+            entry["previous_version"] = previous_version
+        if error is not None:
+            entry["error"] = error
+        self.history.append(entry)
+        return entry
+
+    def ensure_watcher(self):
+        # Threads do not survive fork, so each worker process starts its own
+        if self.watch_interval <= 0 or (self._watcher is not None and self._pid == os.getpid()):
+            return
+        with self._reload_lock:
+            if self._watcher is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._watcher = threading.Thread(target=self._watch, name='model-watcher', daemon=True)
+                self._watcher.start()
+
+    def _watch(self):
+        while True:
+            try:
+                version = artifact_version(self.model_path, self.scaler_path)
+            except OSError:
+                version = None
+            active = self.active
+            # A rejected version is retried only once the files change again
+            if version is not None and version != self._rejected_version and \
+                    (active is None or version != active.version):
+                self.reload('watch')
+            time.sleep(self.watch_interval)
+
+    def stats(self):
+        bundle = self.active
+        return {
+            "active_version": bundle.version if bundle is not None else None,
+            "verdict_version": bundle.verdict_version if bundle is not None else None,
+            "engine": bundle.engine.name if bundle is not None else None,
+            "loaded_at": bundle.loaded_at if bundle is not None else None,
+            "watch_interval_seconds": self.watch_interval,
+            "canary_urls": len(self.canary_urls),
+            "min_agreement": self.min_agreement,
+            "history": list(self.history)
+        }
+
+registry = ModelRegistry(MODEL_PATH, SCALER_PATH, MODEL_WATCH_INTERVAL,
+                         load_canary_urls(MODEL_CANARY_FILE), MODEL_CANARY_MIN_AGREEMENT)
 
 # Request logging middleware
 @app.before_request
 def log_request_info():
-    logger.debug('Request Headers: %s', request.headers)
-    logger.debug('Request Body: %s', request.get_data())
-    logger.info(f"Request from: {request.remote_addr} to {request.path} [{request.method}]")
+    g.request_start = time.perf_counter()
+    registry.ensure_watcher()
+    # Header and body dumps only for a sample of requests, and only at DEBUG
+    g.debug_sampled = logger.isEnabledFor(logging.DEBUG) and random.random() < LOG_DEBUG_SAMPLE_RATE
+    if g.debug_sampled:
+        logger.debug('Request Headers: %s', request.headers)
+        if LOG_REQUEST_BODY:
+            logger.debug('Request Body: %s', request.get_data())
 
-# After request logging
+# After request logging - one access line per request
 @app.after_request
 def log_response_info(response):
-    logger.info(f"Response status: {response.status_code}")
-    logger.debug(f"Response headers: {response.headers}")
+    duration_ms = (time.perf_counter() - g.get('request_start', time.perf_counter())) * 1000
+    access_logger.info('%s %s %s %.2fms from %s', request.method, request.path, response.status_code,
+                       duration_ms, request.remote_addr, extra={'fields': {
+                           "method": request.method,
+                           "path": request.path,
+                           "status": response.status_code,
+                           "duration_ms": round(duration_ms, 3),
+                           "remote_addr": request.remote_addr,
+                           "response_bytes": response.content_length
+                       }})
+    bundle = registry.active
+    if bundle is not None:
+        response.headers['X-Model-Version'] = bundle.version
+    if g.get('debug_sampled'):
+        logger.debug('Response headers: %s', response.headers)
     return response
 
 # Add a simple health check endpoint
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    logger.info(f"Health check request received from: {request.remote_addr}")
+    logger.debug('Health check request received from: %s', request.remote_addr)
     
-    # Get server networking details for debugging
-    network_info = get_network_info()
-    
-    # Return detailed system info for debugging connection issues
+    # Return detailed system info for debugging connection issues, using the
+    # startup network snapshot rather than fresh DNS lookups
+    bundle = registry.active
     return jsonify({
         "status": "ok",
         "message": "Server is running",
-        "model_loaded": model is not None and scaler is not None,
-        "server_info": network_info,
+        "model_loaded": bundle is not None,
+        "model_version": bundle.version if bundle is not None else None,
+        "verdict_cache": verdict_cache.stats(),
+        "verdict_store": verdict_store.stats() if verdict_store is not None else {"enabled": False},
+        "host_cache": host_cache_stats(),
+        "micro_batcher": micro_batcher.stats() if micro_batcher is not None else None,
+        "single_flight": single_flight.stats() if single_flight is not None else None,
+        "inference_pool": inference_pool.stats() if inference_pool is not None else None,
+        "admission": admission.stats(),
+        "domain_lists": {"allowlist": len(allowlist), "blocklist": len(blocklist)},
+        "memory": process_memory(),
+        "server_info": network_snapshot.info,
         "request_ip": request.remote_addr,
         "request_headers": dict(request.headers)
     })
 
+# Liveness probe - constant time, no model or network access
+@app.route('/livez', methods=['GET'])
+def livez():
+    return jsonify({"status": "ok"})
+
+# Readiness probe - ready once the model and scaler are loaded (and the inference pool warmed up)
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    bundle = registry.active
+    loaded = bundle is not None
+    # With an inference pool, also wait until its processes have loaded the model
+    ready = loaded and (inference_pool is None or inference_pool.warm())
+    return jsonify({
+        "status": "ready" if ready else "not ready",
+        "model_loaded": loaded,
+        "model_version": bundle.version if loaded else None
+    }), 200 if ready else 503
+
+# Detailed diagnostics - network snapshot refreshed every NETWORK_INFO_MAX_AGE seconds
+@app.route('/api/diagnostics', methods=['GET'])
+def diagnostics():
+    network_snapshot.refresh_if_stale()
+    bundle = registry.active
+    return jsonify({
+        "server_info": network_snapshot.info,
+        "snapshot_age_seconds": round(network_snapshot.age(), 1),
+        "python_version": platform.python_version(),
+        "sklearn_version": sklearn_version,
+        "model_loaded": bundle is not None,
+        "model_version": bundle.version if bundle is not None else None,
+        "engine": bundle.engine.name if bundle is not None else None,
+        "model_registry": registry.stats(),
+        "cascade": bundle.cascade.stats() if bundle is not None and bundle.cascade is not None else None,
+        "memory": process_memory(proportional=True),
+        "request_ip": request.remote_addr,
+        "request_headers": dict(request.headers)
+    })
+
+# Prometheus scrape endpoint - metrics are per worker process
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    cache_stats = verdict_cache.stats()
+    host_stats = host_cache_stats()
+    memory = process_memory()
+    bundle = registry.active
+    gauges = [
+        ('model_loaded', (), int(bundle is not None)),
+        ('model_info', (('version', bundle.version if bundle is not None else 'none'),
+                        ('engine', bundle.engine.name if bundle is not None else 'none')), 1),
+        ('model_loaded_timestamp_seconds', (), bundle.loaded_at if bundle is not None else 0),
+        ('verdict_cache_size', (), cache_stats['size']),
+        ('verdict_cache_hits_total', (), cache_stats['hits']),
+        ('verdict_cache_misses_total', (), cache_stats['misses']),
+        ('verdict_cache_evictions_total', (), cache_stats['evictions']),
+        ('host_cache_size', (), host_stats['size']),
+        ('host_cache_hits_total', (), host_stats['hits']),
+        ('host_cache_misses_total', (), host_stats['misses']),
+        ('process_resident_memory_kb', (), memory.get('vmrss_kb', memory.get('max_rss_kb', 0))),
+        ('admission_overloaded', (), int(admission.overloaded())),
+        ('admission_in_flight', (), admission.in_flight),
+        ('admission_queued', (), admission.queued),
+    ]
+    if verdict_store is not None:
+        store_stats = verdict_store.stats()
+        gauges += [
+            ('verdict_store_hits_total', (), store_stats['hits']),
+            ('verdict_store_misses_total', (), store_stats['misses']),
+            ('verdict_store_dropped_total', (), store_stats['dropped']),
+            ('verdict_store_errors_total', (), store_stats['errors']),
+        ]
+    return app.response_class(metrics.render(gauges), mimetype='text/plain; version=0.0.4')
+
+# Admin endpoints are disabled unless ADMIN_TOKEN is set
+def admin_authorized():
+    if not ADMIN_TOKEN:
+        return False
+    token = request.headers.get('X-Admin-Token', '')
+    auth = request.headers.get('Authorization', '')
+    if auth.startswith('Bearer '):
+        token = auth[len('Bearer '):]
+    return hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+def admin_denied():
+    if not ADMIN_TOKEN:
+        return jsonify({"error": "Admin endpoints are disabled, set ADMIN_TOKEN to enable them"}), 403
+    return jsonify({"error": "Invalid admin token"}), 401
+
+# Reload the model in this worker - ?wait=1 blocks until it is validated,
+# ?force=1 reloads even when the artifacts have not changed
+@app.route('/api/admin/reload-model', methods=['POST'])
+def admin_reload_model():
+    if not admin_authorized():
+        return admin_denied()
+    force = request.args.get('force') == '1'
+    if request.args.get('wait') == '1':
+        outcome = registry.reload('admin', force)
+        return jsonify(outcome), 422 if outcome["result"] in ('rejected', 'failed') else 200
+    registry.reload_async('admin', force)
+    return jsonify({"result": "started", "active_version": registry.active.version if registry.active else None}), 202
+
+@app.route('/api/admin/model', methods=['GET'])
+def admin_model():
+    if not admin_authorized():
+        return admin_denied()
+    return jsonify(registry.stats())
+
+# Runtime profiling of /api/v1/check-url in this worker. The view is only
+# wrapped while a session runs, so there is no cost when profiling is off.
+request_profiler = RequestProfiler(app, 'check_url')
+
+@app.route('/api/admin/profile', methods=['GET'])
+def admin_profile_status():
+    if not admin_authorized():
+        return admin_denied()
+    return jsonify(request_profiler.status())
+
+# ?mode=cprofile|stacks&sample=0.1&duration=60&interval_ms=5
+@app.route('/api/admin/profile/start', methods=['POST'])
+def admin_profile_start():
+    if not admin_authorized():
+        return admin_denied()
+    try:
+        request_profiler.start(
+            mode=request.args.get('mode', 'cprofile'),
+            sample_rate=float(request.args.get('sample', 0.1)),
+            duration=float(request.args.get('duration', 60)),
+            interval=float(request.args.get('interval_ms', 5)) / 1000)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 409
+    logger.info(f"Profiling started: {request_profiler.status()}")
+    return jsonify(request_profiler.status())
+
+@app.route('/api/admin/profile/stop', methods=['POST'])
+def admin_profile_stop():
+    if not admin_authorized():
+        return admin_denied()
+    request_profiler.stop()
+    return jsonify(request_profiler.status())
+
+# ?format=collapsed (stacks mode), pstats or text (cprofile mode)
+@app.route('/api/admin/profile/download', methods=['GET'])
+def admin_profile_download():
+    if not admin_authorized():
+        return admin_denied()
+    fmt = request.args.get('format', 'collapsed' if request_profiler.mode == 'stacks' else 'pstats')
+    filename = f"check-url-{os.getpid()}"
+    if fmt == 'collapsed':
+        if request_profiler.mode != 'stacks':
+            return jsonify({"error": "Collapsed stacks need a session with mode=stacks"}), 409
+        response = app.response_class(request_profiler.collapsed(), mimetype='text/plain')
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}.collapsed"'
+        return response
+    if request_profiler.mode != 'cprofile':
+        return jsonify({"error": f"Format {fmt} needs a session with mode=cprofile"}), 409
+    if fmt == 'pstats':
+        data = request_profiler.pstats_dump()
+        if data is None:
+            return jsonify({"error": "No requests profiled yet"}), 404
+        response = app.response_class(data, mimetype='application/octet-stream')
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}.pstats"'
+        return response
+    if fmt == 'text':
+        try:
+            text = request_profiler.text(request.args.get('sort', 'cumulative'), int(request.args.get('limit', 40)),
+                                         request.args.get('filter'))
+        except (KeyError, ValueError) as e:
+            return jsonify({"error": f"Invalid sort or limit: {e}"}), 400
+        return app.response_class(text, mimetype='text/plain')
+    return jsonify({"error": "format must be collapsed, pstats or text"}), 400
+
 # Add root route that redirects to health check
 @app.route('/', methods=['GET'])
 def index():
@@ -176,7 +1316,7 @@ def index():
 # Add a connectivity test endpoint
 @app.route('/api/ping', methods=['GET'])
 def ping():
-    logger.info(f"Ping request received from: {request.remote_addr}")
+    logger.debug('Ping request received from: %s', request.remote_addr)
     return jsonify({"message": "pong"})
 
 # Add a test route for debugging model loading and URL checking
@@ -185,20 +1325,26 @@ def test_model():
     logger.info(f"Test request received from: {request.remote_addr}")
     
     test_url = request.args.get('url', 'https://google.com')
+    bundle = registry.active
+    model = bundle.model if bundle is not None else None
+    scaler = bundle.scaler if bundle is not None else None
     
     # Detailed diagnostics
     result = {
         "model_loaded": model is not None,
         "scaler_loaded": scaler is not None,
+        "model_version": bundle.version if bundle is not None else None,
         "sklearn_version": sklearn_version,
         "model_type": str(type(model)) if model else "None",
         "scaler_type": str(type(scaler)) if scaler else "None",
         "test_url": test_url,
+        # Scored in the same normalized form as /api/v1/check-url
+        "scored_url": normalize_url(test_url),
     }
     
     # Try feature extraction
     try:
-        features = extract_features(test_url)
+        features = extract_features(result["scored_url"])
         result["feature_extraction"] = "success"
         result["feature_count"] = len(features)
         result["first_few_features"] = features[:5]
@@ -206,85 +1352,179 @@ def test_model():
         result["feature_extraction"] = f"error: {str(e)}"
     
     # Try using model if available
-    if model is not None and scaler is not None:
+    if bundle is not None:
+        engine = bundle.engine
         try:
-            features = extract_features(test_url)
-            features_scaled = scaler.transform([features])
-            prediction = model.predict(features_scaled)[0]
-            probabilities = model.predict_proba(features_scaled)[0].tolist()
+            features = extract_features_into(result["scored_url"], np.empty((1, N_FEATURES)))
+            probabilities = engine.predict_proba(features)[0]
+            prediction = engine.classes[np.argmax(probabilities)]
             
             result["scaling"] = "success"
+            result["engine"] = engine.name
             result["prediction"] = int(prediction)
-            result["probabilities"] = probabilities
+            result["probabilities"] = probabilities.tolist()
             result["is_safe"] = bool(prediction == 0)
+
+            # Compare the serving engine against the joblib model for this URL
+            if isinstance(engine, FusedInference):
+                result["engine_parity_diff"] = check_engine_parity(engine.fast, engine.reference, features)
         except Exception as e:
             result["model_prediction"] = f"error: {str(e)}"
             result["traceback"] = traceback.format_exc()
     
     # Try fallback
     try:
-        fallback_result = heuristic_url_check(test_url)
-        if hasattr(fallback_result, 'json'):
-            fallback_result = fallback_result.json
-        result["fallback_check"] = fallback_result
+        result["fallback_check"] = heuristic_url_verdict(test_url)
     except Exception as e:
         result["fallback_check"] = f"error: {str(e)}"
     
     return jsonify(result)
 
+# Feature contract expected by the model, in column order
+FEATURE_ORDER = (
+    'length_url', 'length_hostname', 'ip', 'nb_dots', 'nb_hyphens', 'nb_at', 'nb_qm', 'nb_and', 'nb_or', 'nb_eq',
+    'nb_underscore', 'nb_tilde', 'nb_percent', 'nb_slash', 'nb_star', 'nb_colon', 'nb_comma', 'nb_semicolon', 'nb_dollar',
+    'nb_space', 'nb_www', 'nb_com', 'nb_dslash', 'http_in_path', 'https_token', 'ratio_digits_url', 'ratio_digits_host',
+    'nb_redirection', 'length_words_raw', 'char_repeat', 'shortest_word_length', 'longest_word_length', 'avg_word_length'
+)
+N_FEATURES = len(FEATURE_ORDER)
+
+# Compiled once instead of being looked up on every call
+WORD_PATTERN = re.compile(r'\w+')
+REPEAT_PATTERN = re.compile(r'((.)\2+)')
+IP_PATTERN = re.compile(r'\d+\.\d+\.\d+\.\d+')
+ASCII_DIGITS = str.maketrans('', '', '0123456789')
+
+def _count_digits(text):
+    # str.isdigit() only matches 0-9 in ASCII text, which translate() strips in C
+    if text.isascii():
+        return len(text) - len(text.translate(ASCII_DIGITS))
+    return sum(c.isdigit() for c in text)
+
+# Everything derived from the hostname alone, computed once per host
+HostInfo = namedtuple('HostInfo', ['length', 'ip', 'digit_ratio', 'subdomains', 'blocklisted', 'allowlisted', 'common_safe'])
+
+def _host_info(hostname):
+    return HostInfo(
+        len(hostname),
+        1 if IP_PATTERN.match(hostname) else 0,
+        _count_digits(hostname) / len(hostname) if hostname else 0,
+        hostname.count('.'),
+        blocklist.match(hostname),
+        allowlist.match(hostname),
+        hostname in COMMON_SAFE_DOMAINS
+    )
+
+# Bounded LRU shared by the extractor, the heuristic and the domain lists -
+# traffic has far fewer distinct hosts than URLs. HOST_CACHE_SIZE=0 disables it.
+HOST_CACHE_SIZE = int(os.environ.get('HOST_CACHE_SIZE', 65536))
+host_info = functools.lru_cache(maxsize=HOST_CACHE_SIZE)(_host_info)
+
+def host_cache_stats():
+    info = host_info.cache_info()
+    return {
+        "enabled": HOST_CACHE_SIZE > 0,
+        "size": info.currsize,
+        "max_size": info.maxsize,
+        "hits": info.hits,
+        "misses": info.misses
+    }
+
+def _feature_values(url):
+    """Compute the 33 model features for one URL as a tuple in FEATURE_ORDER.
+
+    Character counts run as C-level str.count scans (measured faster than a
+    Counter pass for URL-sized strings), words come from a single regex scan
+    and only runs of two or more repeated characters are visited for
+    char_repeat. Output is identical to the original dict-based extractor.
+    """
+    parsed_url = urlparse(url)
+    host = host_info(parsed_url.hostname or '')
+    path = parsed_url.path.lower() if parsed_url.path else ''
+
+    length_url = len(url)
+    count = url.count
+
+    word_lengths = list(map(len, WORD_PATTERN.findall(url)))
+    nb_words = len(word_lengths)
+
+    # (.)\1* matches every character except newline, so any other character
+    # gives a run of at least one
+    char_repeat = max([len(run) for run, _ in REPEAT_PATTERN.findall(url)], default=0)
+    if not char_repeat and count('\n') < length_url:
+        char_repeat = 1
+
+    nb_dslash = count('//')
+
+    return (
+        length_url,
+        host.length,
+        host.ip,
+        count('.'),
+        count('-'),
+        count('@'),
+        count('?'),
+        count('&'),
+        count('|'),
+        count('='),
+        count('_'),
+        count('~'),
+        count('%'),
+        count('/'),
+        count('*'),
+        count(':'),
+        count(','),
+        count(';'),
+        count('$'),
+        count(' '),
+        count('www'),
+        count('.com'),
+        nb_dslash,
+        1 if 'http' in path else 0,
+        1 if 'https' in path else 0,
+        _count_digits(url) / length_url,
+        host.digit_ratio,
+        nb_dslash,
+        nb_words,
+        char_repeat,
+        min(word_lengths) if word_lengths else 0,
+        max(word_lengths) if word_lengths else 0,
+        sum(word_lengths) / nb_words if nb_words else 0
+    )
+
 def extract_features(url):
     try:
-        parsed_url = urlparse(url)
-        hostname = parsed_url.hostname if parsed_url.hostname else ''
-        path = parsed_url.path if parsed_url.path else ''
-
-        features = {
-            'length_url': len(url),
-            'length_hostname': len(hostname),
-            'ip': int(bool(re.match(r'\d+\.\d+\.\d+\.\d+', hostname))),
-            'nb_dots': url.count('.'),
-            'nb_hyphens': url.count('-'),
-            'nb_at': url.count('@'),
-            'nb_qm': url.count('?'),
-            'nb_and': url.count('&'),
-            'nb_or': url.count('|'),
-            'nb_eq': url.count('='),
-            'nb_underscore': url.count('_'),
-            'nb_tilde': url.count('~'),
-            'nb_percent': url.count('%'),
-            'nb_slash': url.count('/'),
-            'nb_star': url.count('*'),
-            'nb_colon': url.count(':'),
-            'nb_comma': url.count(','),
-            'nb_semicolon': url.count(';'),
-            'nb_dollar': url.count('$'),
-            'nb_space': url.count(' '),
-            'nb_www': url.count('www'),
-            'nb_com': url.count('.com'),
-            'nb_dslash': url.count('//'),
-            'http_in_path': int('http' in path.lower()),
-            'https_token': int('https' in path.lower()),
-            'ratio_digits_url': sum(c.isdigit() for c in url) / len(url),
-            'ratio_digits_host': sum(c.isdigit() for c in hostname) / len(hostname) if hostname else 0,
-            'nb_redirection': url.count('//'),
-            'length_words_raw': len(re.findall(r'\w+', url)),
-            'char_repeat': max([len(m.group(0)) for m in re.finditer(r'(.)\1*', url)], default=0),
-            'shortest_word_length': min([len(word) for word in re.findall(r'\w+', url)], default=0),
-            'longest_word_length': max([len(word) for word in re.findall(r'\w+', url)], default=0),
-            'avg_word_length': np.mean([len(word) for word in re.findall(r'\w+', url)]) if re.findall(r'\w+', url) else 0
-        }
-
-        feature_order = [
-            'length_url', 'length_hostname', 'ip', 'nb_dots', 'nb_hyphens', 'nb_at', 'nb_qm', 'nb_and', 'nb_or', 'nb_eq',
-            'nb_underscore', 'nb_tilde', 'nb_percent', 'nb_slash', 'nb_star', 'nb_colon', 'nb_comma', 'nb_semicolon', 'nb_dollar',
-            'nb_space', 'nb_www', 'nb_com', 'nb_dslash', 'http_in_path', 'https_token', 'ratio_digits_url', 'ratio_digits_host',
-            'nb_redirection', 'length_words_raw', 'char_repeat', 'shortest_word_length', 'longest_word_length', 'avg_word_length'
-        ]
+        return list(_feature_values(url))
+    except Exception as e:
+        logger.error(f"Error extracting features from URL {url}: {e}")
+        raise
 
-        return [features[feature] for feature in feature_order]
+def extract_features_into(url, out):
+    """Write the features of one URL straight into a preallocated row"""
+    try:
+        out[:] = _feature_values(url)
     except Exception as e:
         logger.error(f"Error extracting features from URL {url}: {e}")
         raise
+    return out
+
+def extract_features_batch(urls, out=None):
+    """Extract features for many URLs into one (len(urls), N_FEATURES) matrix"""
+    if out is None:
+        out = np.empty((len(urls), N_FEATURES), dtype=float)
+    for i, url in enumerate(urls):
+        extract_features_into(url, out[i])
+    return out
+
+# The first model is loaded once the feature extractor exists, since the
+# parity and canary checks score a few probe URLs
+registry.load_initial()
+
+# Multi-core inference - with INFERENCE_POOL_WORKERS > 0, feature extraction
+# and the model run in that many worker processes per server process
+INFERENCE_POOL_WORKERS = int(os.environ.get('INFERENCE_POOL_WORKERS', 0))
+INFERENCE_POOL_CHUNK = int(os.environ.get('INFERENCE_POOL_CHUNK', 256))
+inference_pool = InferencePool(INFERENCE_POOL_WORKERS, INFERENCE_POOL_CHUNK) if INFERENCE_POOL_WORKERS > 0 else None
 
 def predict_url_safety(url):
     try:
@@ -292,45 +1532,99 @@ def predict_url_safety(url):
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
 
-        # Extract features
-        features = extract_features(url)
-        logger.info(f"Extracted {len(features)} features from URL: {url}")
+        # Known-good and known-bad hosts are answered from the domain lists
+        listed = domain_list_verdict(url)
+        if listed is not None:
+            metrics.inc('url_check_answers_total', PATH_DOMAIN_LIST)
+            return listed
 
-        # Scale features
-        try:
-            features_scaled = scaler.transform([features])
-            logger.info(f"Features scaled successfully")
-        except Exception as e:
-            logger.error(f"Error scaling features: {e}")
-            # Try alternative scaling method
-            features_scaled = np.array([features])
-            logger.info(f"Using unscaled features as fallback")
+        # Serve repeated URLs from the verdict cache. Every spelling that
+        # shares a key is also scored in its normalized form, so the cached
+        # verdict does not depend on which spelling arrived first.
+        start = time.perf_counter()
+        cache_key = normalize_url(url)
+        metrics.observe('url_check_stage_seconds', time.perf_counter() - start, STAGE_NORMALIZE)
+        cached = verdict_cache.get(cache_key)
+        if cached is not None:
+            logger.debug('Verdict cache hit for URL: %s', url)
+            metrics.inc('url_check_answers_total', PATH_CACHE)
+            return dict(cached, url=url)
+        bundle = registry.active
+        engine = bundle.engine
 
-        # Predict with better error handling
-        try:
-            prediction = model.predict(features_scaled)
-            probabilities = model.predict_proba(features_scaled)[0]
-            is_malicious = prediction[0] == 1
-            logger.info(f"Model prediction: {prediction[0]}, probabilities: safe={probabilities[0]:.2f}, unsafe={probabilities[1]:.2f}")
-        except Exception as e:
-            logger.error(f"Error during prediction: {e}")
-            logger.error(traceback.format_exc())
-            return {
-                "url": url,
-                "is_safe": False,
-                "confidence": 0.0,
-                "details": f"Error during prediction: {str(e)}"
-            }
+        # Verdicts computed by another worker or before the last restart
+        if verdict_store is not None:
+            stored = verdict_store.get(cache_key, store_version(bundle.verdict_version))
+            if stored is not None:
+                verdict_cache.put(cache_key, stored, bundle.verdict_version)
+                metrics.inc('url_check_answers_total', PATH_STORE)
+                return dict(stored, url=url)
+
+        # The cheap cascade tier answers URLs it is confident about
+        early = None
+        if bundle.cascade is not None:
+            start = time.perf_counter()
+            early = bundle.cascade.decide(cache_key)
+            metrics.observe('url_check_stage_seconds', time.perf_counter() - start, STAGE_CASCADE)
+
+        if early is not None:
+            is_malicious, confidence = early
+            answer_path = PATH_CASCADE
+            logger.debug('Cascade verdict for URL: %s (malicious=%s)', url, is_malicious)
+        else:
+            # Extract features
+            start = time.perf_counter()
+            features = extract_features_into(cache_key, np.empty((1, N_FEATURES)))
+            metrics.observe('url_check_stage_seconds', time.perf_counter() - start, STAGE_EXTRACT)
+            logger.debug('Extracted %d features from URL: %s', N_FEATURES, url)
+
+            # Scale and predict in one call, the label is derived from the probabilities
+            try:
+                start = time.perf_counter()
+                probabilities = engine.predict_proba(features)[0]
+                metrics.observe('url_check_stage_seconds', time.perf_counter() - start, STAGE_INFERENCE)
+                prediction = engine.classes[np.argmax(probabilities)]
+                is_malicious = prediction == 1
+                confidence = float(probabilities[0] if not is_malicious else probabilities[1])
+                answer_path = PATH_MODEL
+                logger.debug('Model prediction: %s, probabilities: safe=%.2f, unsafe=%.2f', prediction, probabilities[0], probabilities[1])
+            except Exception as e:
+                logger.error(f"Error during prediction: {e}")
+                logger.error(traceback.format_exc())
+                metrics.inc('url_check_answers_total', PATH_MODEL_ERROR)
+                return {
+                    "url": url,
+                    "is_safe": False,
+                    "confidence": 0.0,
+                    "details": f"Error during prediction: {str(e)}"
+                }
 
         # Format response to match what Flutter expects
-        return {
+        result = {
             "url": url,
             "is_safe": not is_malicious,
-            "confidence": float(probabilities[0] if not is_malicious else probabilities[1]),
-            "details": "This URL appears to be safe." if not is_malicious else "This URL was flagged as potentially malicious. Proceed with caution."
+            "confidence": confidence,
+            "details": "This URL appears to be safe." if not is_malicious else "This URL was flagged as potentially malicious. Proceed with caution.",
+            "model_version": bundle.version
         }
+        if early is not None:
+            result["tier"] = "cascade"
+
+        # Report suspicious keywords alongside the model verdict
+        start = time.perf_counter()
+        keywords = keyword_matcher.find(cache_key)
+        metrics.observe('url_check_stage_seconds', time.perf_counter() - start, STAGE_KEYWORDS)
+        if keywords:
+            result["keywords"] = keywords
+
+        verdict_cache.put(cache_key, result, bundle.verdict_version)
+        if verdict_store is not None:
+            verdict_store.put(cache_key, store_version(bundle.verdict_version), result)
+        metrics.inc('url_check_answers_total', answer_path)
+        return result
     except Exception as e:
         logger.error(f"Error predicting URL safety: {e}")
+        metrics.inc('url_check_answers_total', PATH_MODEL_ERROR)
         return {
             "url": url,
             "is_safe": False,
@@ -338,14 +1632,525 @@ def predict_url_safety(url):
             "details": f"Unable to analyze URL: {str(e)}"
         }
 
+def predict_urls_safety(urls):
+    """Score a batch of URLs with a single scaler and model call"""
+    results = [None] * len(urls)
+    features = np.empty((len(urls), N_FEATURES))
+    row_urls = []
+    cache_hits = 0
+    store_hits = 0
+    cascade_answers = 0
+    bundle = registry.active
+    cascade = bundle.cascade if bundle is not None else None
+    stored_version = store_version(bundle.verdict_version) if verdict_store is not None and bundle is not None else None
+
+    # Extract features for every URL up front so the model sees one matrix
+    start = time.perf_counter()
+    for i, url in enumerate(urls):
+        if not isinstance(url, str) or not url:
+            results[i] = {
+                "url": url,
+                "is_safe": False,
+                "confidence": 0.0,
+                "details": "No URL provided"
+            }
+            continue
+
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+
+        listed = domain_list_verdict(url)
+        if listed is not None:
+            results[i] = listed
+            metrics.inc('url_check_answers_total', PATH_DOMAIN_LIST)
+            continue
+
+        cache_key = normalize_url(url)
+        cached = verdict_cache.get(cache_key)
+        if cached is not None:
+            results[i] = dict(cached, url=url)
+            cache_hits += 1
+            continue
+        if stored_version is not None:
+            stored = verdict_store.get(cache_key, stored_version)
+            if stored is not None:
+                verdict_cache.put(cache_key, stored, bundle.verdict_version)
+                results[i] = dict(stored, url=url)
+                store_hits += 1
+                continue
+
+        try:
+            # Scored in normalized form, like predict_url_safety
+            early = cascade.decide(cache_key) if cascade is not None else None
+            if early is not None:
+                is_malicious, confidence = early
+                results[i] = {
+                    "url": url,
+                    "is_safe": not is_malicious,
+                    "confidence": confidence,
+                    "details": "This URL appears to be safe." if not is_malicious else "This URL was flagged as potentially malicious. Proceed with caution.",
+                    "model_version": bundle.version,
+                    "tier": "cascade"
+                }
+                keywords = keyword_matcher.find(cache_key)
+                if keywords:
+                    results[i]["keywords"] = keywords
+                verdict_cache.put(cache_key, results[i], bundle.verdict_version)
+                if stored_version is not None:
+                    verdict_store.put(cache_key, stored_version, results[i])
+                cascade_answers += 1
+                continue
+
+            # The inference pool extracts features in its own processes
+            if inference_pool is None:
+                extract_features_into(cache_key, features[len(row_urls)])
+            row_urls.append((i, url, cache_key))
+        except Exception as e:
+            results[i] = {
+                "url": url,
+                "is_safe": False,
+                "confidence": 0.0,
+                "details": f"Unable to analyze URL: {str(e)}"
+            }
+
+    metrics.observe('url_check_stage_seconds', time.perf_counter() - start, STAGE_EXTRACT_BATCH)
+    if cache_hits:
+        metrics.inc('url_check_answers_total', PATH_CACHE, cache_hits)
+    if store_hits:
+        metrics.inc('url_check_answers_total', PATH_STORE, store_hits)
+    if cascade_answers:
+        metrics.inc('url_check_answers_total', PATH_CASCADE, cascade_answers)
+
+    if not row_urls:
+        return results
+
+    engine = bundle.engine
+    features = features[:len(row_urls)]
+    version = bundle.version
+
+    # One scale+probability call for the whole batch, labels derived from it
+    try:
+        start = time.perf_counter()
+        if inference_pool is not None:
+            try:
+                probabilities, errors = inference_pool.predict_proba([key for _, _, key in row_urls], version)
+            except Exception as e:
+                # Workers that cannot score with this model version must not
+                # answer for it, the batch is scored in this process instead
+                logger.error(f"Inference pool failed, scoring the batch in-process: {e}")
+                errors = {}
+                for row, (_, _, cache_key) in enumerate(row_urls):
+                    try:
+                        extract_features_into(cache_key, features[row])
+                    except Exception as error:
+                        features[row] = 0.0
+                        errors[row] = str(error)
+                probabilities = engine.predict_proba(features)
+            for row, message in errors.items():
+                i, url, _ = row_urls[row]
+                results[i] = {
+                    "url": url,
+                    "is_safe": False,
+                    "confidence": 0.0,
+                    "details": f"Unable to analyze URL: {message}"
+                }
+            if errors:
+                keep = [row for row in range(len(row_urls)) if row not in errors]
+                row_urls = [row_urls[row] for row in keep]
+                probabilities = probabilities[keep]
+        else:
+            probabilities = engine.predict_proba(features)
+        predictions = engine.classes[np.argmax(probabilities, axis=1)]
+        metrics.observe('url_check_stage_seconds', time.perf_counter() - start, STAGE_INFERENCE_BATCH)
+    except Exception as e:
+        logger.error(f"Error during batch prediction: {e}")
+        logger.error(traceback.format_exc())
+        metrics.inc('url_check_answers_total', PATH_MODEL_ERROR, len(row_urls))
+        for i, url, _ in row_urls:
+            results[i] = {
+                "url": url,
+                "is_safe": False,
+                "confidence": 0.0,
+                "details": f"Error during prediction: {str(e)}"
+            }
+        return results
+
+    for (i, url, cache_key), prediction, probs in zip(row_urls, predictions, probabilities):
+        is_malicious = prediction == 1
+        results[i] = {
+            "url": url,
+            "is_safe": not is_malicious,
+            "confidence": float(probs[0] if not is_malicious else probs[1]),
+            "details": "This URL appears to be safe." if not is_malicious else "This URL was flagged as potentially malicious. Proceed with caution.",
+            "model_version": version
+        }
+        keywords = keyword_matcher.find(cache_key)
+        if keywords:
+            results[i]["keywords"] = keywords
+        verdict_cache.put(cache_key, results[i], bundle.verdict_version)
+        if stored_version is not None:
+            verdict_store.put(cache_key, stored_version, results[i])
+
+    metrics.inc('url_check_answers_total', PATH_MODEL, len(row_urls))
+    logger.debug('Scored batch of %d URLs (%d rejected)', len(row_urls), len(urls) - len(row_urls))
+    return results
+
+# Coalesces concurrent single-URL checks into one vectorized batch call
+class MicroBatcher:
+    def __init__(self, score_batch, max_batch_size, max_wait):
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    def submit(self, url):
+        """Queue a URL for the next batch and return a Future for its verdict"""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((url, future))
+        return future
+
+    def _ensure_worker(self):
+        # Threads do not survive fork, so each worker process starts its own
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, args=(self._queue,),
+                                                name='micro-batcher', daemon=True)
+                self._thread.start()
+
+    def _run(self, pending):
+        while True:
+            batch = [pending.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        try:
+            results = self.score_batch([url for url, _ in batch])
+        except Exception as e:
+            logger.error(f"Error scoring micro-batch of {len(batch)} URLs: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+        self.batches += 1
+        self.items += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+
+    def stats(self):
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": self.batches,
+            "items": self.items,
+            "largest_batch": self.largest_batch,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0
+        }
+
+# Micro-batching of /api/v1/check-url - off unless MICRO_BATCH_ENABLED=1
+MICRO_BATCH_ENABLED = os.environ.get('MICRO_BATCH_ENABLED', '0') == '1'
+MICRO_BATCH_SIZE = int(os.environ.get('MICRO_BATCH_SIZE', 64))
+MICRO_BATCH_MAX_WAIT_MS = float(os.environ.get('MICRO_BATCH_MAX_WAIT_MS', 2))
+micro_batcher = MicroBatcher(predict_urls_safety, MICRO_BATCH_SIZE, MICRO_BATCH_MAX_WAIT_MS / 1000) if MICRO_BATCH_ENABLED else None
+
+# Coalesces concurrent checks of the same URL - the first caller computes the
+# verdict and duplicates arriving while it runs wait on the same Future
+class SingleFlight:
+    def __init__(self):
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """Return fn() for the first caller with this key, and its result for concurrent duplicates"""
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._in_flight[key] = Future()
+                self.leaders += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            metrics.inc('url_check_coalesced_total')
+            return future.result()
+
+        try:
+            result = fn()
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._in_flight),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced
+            }
+
+# Single-flight deduplication of /api/v1/check-url - on unless SINGLE_FLIGHT_ENABLED=0
+SINGLE_FLIGHT_ENABLED = os.environ.get('SINGLE_FLIGHT_ENABLED', '1') == '1'
+single_flight = SingleFlight() if SINGLE_FLIGHT_ENABLED else None
+
+def score_url(url):
+    if micro_batcher is not None:
+        return micro_batcher.submit(url).result()
+    if inference_pool is not None:
+        return predict_urls_safety([url])[0]
+    return predict_url_safety(url)
+
+# Admission control for /api/v1/check-url: per-client token buckets and a
+# bounded number of checks scoring at once. Checks that cannot get a slot
+# before their deadline are answered degraded, from cached verdicts or the
+# heuristic, instead of queueing until clients time out.
+class AdmissionController:
+    SHED_REASONS = ('rate_limited', 'queue_full', 'deadline', 'overload')
+
+    def __init__(self, client_rate, client_burst, max_in_flight, max_queue, queue_timeout, overload_hold,
+                 max_clients=100000):
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.overload_hold = overload_hold
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._bucket_lock = threading.Lock()
+        self._slots = threading.Condition()
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.overloaded_until = 0.0
+        self.overload_episodes = 0
+        self.shed = dict.fromkeys(self.SHED_REASONS, 0)
+        self._shed_labels = {reason: (('reason', reason),) for reason in self.SHED_REASONS}
+
+    def allow(self, client):
+        """Take a token from the client's bucket, False when it is empty"""
+        if self.client_rate <= 0:
+            return True
+        now = time.monotonic()
+        with self._bucket_lock:
+            tokens, last = self._buckets.pop(client, (self.client_burst, now))
+            tokens = min(self.client_burst, tokens + (now - last) * self.client_rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[client] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        if not allowed:
+            self._shed('rate_limited')
+        return allowed
+
+    def retry_after(self):
+        return max(1, math.ceil(1 / self.client_rate)) if self.client_rate > 0 else 1
+
+    def acquire(self):
+        """Take a scoring slot, waiting until the deadline; False means answer degraded"""
+        if self.max_in_flight <= 0:
+            return True
+        with self._slots:
+            if self.in_flight < self.max_in_flight:
+                self.in_flight += 1
+                self.admitted += 1
+                return True
+            now = time.monotonic()
+            # While overloaded, checks that find every slot busy do not queue at all
+            if now < self.overloaded_until:
+                reason = 'overload'
+            elif self.queued >= self.max_queue:
+                reason = 'queue_full'
+            else:
+                self.queued += 1
+                deadline = now + self.queue_timeout
+                try:
+                    while self.in_flight >= self.max_in_flight:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._slots.wait(remaining)
+                finally:
+                    self.queued -= 1
+                if self.in_flight < self.max_in_flight:
+                    self.in_flight += 1
+                    self.admitted += 1
+                    return True
+                reason = 'deadline'
+            if time.monotonic() >= self.overloaded_until:
+                self.overload_episodes += 1
+                logger.warning(f"Entering overload mode ({reason}), answering URL checks degraded")
+            self.overloaded_until = time.monotonic() + self.overload_hold
+        self._shed(reason)
+        return False
+
+    def release(self):
+        # acquire() takes no slot when slots are disabled
+        if self.max_in_flight <= 0:
+            return
+        with self._slots:
+            self.in_flight -= 1
+            self._slots.notify()
+
+    def overloaded(self):
+        return time.monotonic() < self.overloaded_until
+
+    def _shed(self, reason):
+        with self._bucket_lock:
+            self.shed[reason] += 1
+        metrics.inc('admission_shed_total', self._shed_labels[reason])
+
+    def stats(self):
+        with self._bucket_lock:
+            clients = len(self._buckets)
+            shed = dict(self.shed)
+        return {
+            "overloaded": self.overloaded(),
+            "overload_episodes": self.overload_episodes,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "shed": shed,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "queue_timeout_ms": round(self.queue_timeout * 1000),
+            "client_rate": self.client_rate,
+            "client_burst": self.client_burst,
+            "clients": clients
+        }
+
+def admission_slots(pool_workers, micro_batch_size):
+    """Default scoring slots: enough to keep the inference pool busy and to fill two micro-batches"""
+    # A micro-batch only holds checks that already have a slot, so fewer
+    # slots than MICRO_BATCH_SIZE would cap every batch at the slot count
+    return max(4, 2 * pool_workers, 2 * micro_batch_size)
+
+# Limits are per worker process; ADMISSION_MAX_IN_FLIGHT=0 disables slots,
+# ADMISSION_CLIENT_RATE=0 (the default) disables per-client buckets
+ADMISSION_MAX_IN_FLIGHT = int(os.environ.get('ADMISSION_MAX_IN_FLIGHT', admission_slots(
+    INFERENCE_POOL_WORKERS, MICRO_BATCH_SIZE if MICRO_BATCH_ENABLED else 0)))
+ADMISSION_MAX_QUEUE = int(os.environ.get('ADMISSION_MAX_QUEUE', 32))
+ADMISSION_QUEUE_TIMEOUT_MS = float(os.environ.get('ADMISSION_QUEUE_TIMEOUT_MS', 500))
+ADMISSION_OVERLOAD_HOLD = float(os.environ.get('ADMISSION_OVERLOAD_HOLD', 5))
+ADMISSION_CLIENT_RATE = float(os.environ.get('ADMISSION_CLIENT_RATE', 0))
+ADMISSION_CLIENT_BURST = float(os.environ.get('ADMISSION_CLIENT_BURST', max(1.0, 2 * ADMISSION_CLIENT_RATE)))
+admission = AdmissionController(ADMISSION_CLIENT_RATE, ADMISSION_CLIENT_BURST, ADMISSION_MAX_IN_FLIGHT,
+                                ADMISSION_MAX_QUEUE, ADMISSION_QUEUE_TIMEOUT_MS / 1000, ADMISSION_OVERLOAD_HOLD)
+
+def degraded_verdict(url):
+    """Cheap verdict under overload: a stored model verdict if there is one, else the heuristic"""
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    cache_key = normalize_url(url)
+    bundle = registry.active
+    stored = verdict_cache.get(cache_key)
+    if stored is None and verdict_store is not None and bundle is not None:
+        stored = verdict_store.get(cache_key, store_version(bundle.verdict_version))
+    if stored is not None:
+        result = dict(stored, url=url)
+    else:
+        start = time.perf_counter()
+        result = heuristic_url_verdict(url)
+        metrics.observe('url_check_stage_seconds', time.perf_counter() - start, STAGE_HEURISTIC)
+    result["degraded"] = True
+    metrics.inc('url_check_answers_total', PATH_DEGRADED)
+    return result
+
+def admit_and_score(url):
+    """Full verdict when a scoring slot frees up in time, degraded verdict otherwise"""
+    if not admission.acquire():
+        return degraded_verdict(url)
+    try:
+        return score_url(url)
+    finally:
+        admission.release()
+
+def admit_and_score_batch(urls):
+    """Verdicts for a batch scored under one scoring slot, degraded verdicts if none frees up in time"""
+    if not admission.acquire():
+        return [degraded_verdict(url) for url in urls]
+    try:
+        return predict_urls_safety(urls)
+    finally:
+        admission.release()
+
+# HTTP caching of GET /api/v1/check-url - CHECK_URL_MAX_AGE=0 turns it off
+CHECK_URL_MAX_AGE = int(os.environ.get('CHECK_URL_MAX_AGE', 300))
+VERDICT_MIMETYPES = ['application/json']
+if msgpack is not None:
+    VERDICT_MIMETYPES += ['application/msgpack', 'application/x-msgpack']
+
+def negotiate_verdict_mimetype():
+    """JSON unless the client prefers MessagePack in its Accept header"""
+    if len(VERDICT_MIMETYPES) == 1:
+        return 'application/json'
+    return request.accept_mimetypes.best_match(VERDICT_MIMETYPES, default='application/json')
+
+def verdict_etag(url, version, mimetype):
+    key = f"{normalize_url(url)}\0{version}\0{VERDICT_INPUTS_VERSION}\0{mimetype}"
+    return hashlib.sha1(key.encode()).hexdigest()[:20]
+
+def verdict_response(payload, mimetype):
+    start = time.perf_counter()
+    if mimetype == 'application/json':
+        response = jsonify(payload)
+    else:
+        response = app.response_class(msgpack.packb(payload), mimetype=mimetype)
+    metrics.observe('url_check_stage_seconds', time.perf_counter() - start, STAGE_SERIALIZE)
+    if len(VERDICT_MIMETYPES) > 1:
+        response.vary.add('Accept')
+    return response
+
+def set_verdict_caching(response, etag):
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = f'public, max-age={CHECK_URL_MAX_AGE}'
+    return response
+
 @app.route('/api/v1/check-url', methods=['POST', 'GET'])
 def check_url():
+    url = None
     try:
+        if not admission.allow(request.remote_addr):
+            response = jsonify({"error": "Too many requests, slow down"})
+            response.status_code = 429
+            response.headers['Retry-After'] = str(admission.retry_after())
+            return response
+
         if request.method == 'POST':
             if request.is_json:
                 data = request.get_json()
                 url = data.get('url')
-                logger.info(f"Received POST request to check URL: {url}")
+                logger.debug('Received POST request to check URL: %s', url)
             else:
                 # Handle form data
                 url = request.form.get('url')
@@ -353,26 +2158,56 @@ def check_url():
                     return jsonify({"error": "No URL provided in form data"}), 400
         else:  # GET request
             url = request.args.get('url')
-            logger.info(f"Received GET request to check URL: {url}")
+            logger.debug('Received GET request to check URL: %s', url)
 
         if not url:
             return jsonify({"error": "No URL provided"}), 400
 
-        if model is None or scaler is None:
+        bundle = registry.active
+        if bundle is None:
             logger.warning("Model not available, using fallback heuristic checks")
             # Fallback to basic heuristic checks if model is not available
-            return heuristic_url_check(url)
+            start = time.perf_counter()
+            response = heuristic_url_check(url)
+            metrics.observe('url_check_stage_seconds', time.perf_counter() - start, STAGE_HEURISTIC)
+            metrics.inc('url_check_answers_total', PATH_FALLBACK)
+            # Do not let clients keep fallback verdicts once the model is back
+            response.headers['Cache-Control'] = 'no-store'
+            return response
+
+        # A client or CDN revalidating a verdict it already holds needs no scoring
+        mimetype = negotiate_verdict_mimetype()
+        cacheable = request.method == 'GET' and CHECK_URL_MAX_AGE > 0
+        if cacheable:
+            etag = verdict_etag(url, bundle.verdict_version, mimetype)
+            if request.if_none_match.contains_weak(etag):
+                metrics.inc('url_check_answers_total', PATH_NOT_MODIFIED)
+                return set_verdict_caching(app.response_class(status=304), etag)
 
         # Add debugging for model prediction process
-        logger.info(f"Using model to predict safety for URL: {url}")
-        result = predict_url_safety(url)
-        logger.info(f"Prediction result: {result}")
-        
-        return jsonify(result)
+        if single_flight is not None:
+            # Duplicates share the leader's verdict but report their own URL
+            result = single_flight.do(normalize_url(url), lambda: admit_and_score(url))
+            result = dict(result, url=url if url.startswith(('http://', 'https://')) else 'https://' + url)
+        else:
+            result = admit_and_score(url)
+        logger.debug('Prediction result: %s', result)
+
+        response = verdict_response(result, mimetype)
+        # Error verdicts (confidence 0) are never cached, overload answers must not outlive the overload
+        if result.get("degraded"):
+            response.headers['Cache-Control'] = 'no-store'
+        elif cacheable and result.get("confidence"):
+            # Tag with the bundle that produced the verdict, the model may have been reloaded meanwhile
+            version = result.get("model_version", bundle.version)
+            producer = next((b for b in (bundle, registry.active) if b is not None and b.version == version), bundle)
+            set_verdict_caching(response, verdict_etag(url, producer.verdict_version, mimetype))
+        return response
 
     except Exception as e:
         logger.error(f"Error in check_url endpoint: {e}")
         logger.error(traceback.format_exc())
+        metrics.inc('url_check_answers_total', PATH_ERROR)
         return jsonify({
             "url": url,
             "is_safe": False,
@@ -380,32 +2215,146 @@ def check_url():
             "details": f"Server error: {str(e)}"
         }), 500
 
+# Batch endpoint - score many URLs in one round trip
+@app.route('/api/v1/check-urls', methods=['POST'])
+def check_urls():
+    data = request.get_json(silent=True)
+    urls = data.get('urls') if isinstance(data, dict) else None
+
+    if not isinstance(urls, list) or not urls:
+        return jsonify({"error": "No URLs provided, expected JSON body with a 'urls' list"}), 400
+
+    if len(urls) > MAX_BATCH_URLS:
+        return jsonify({"error": f"Too many URLs in one request (max {MAX_BATCH_URLS})"}), 413
+
+    logger.debug('Received batch request to check %d URLs', len(urls))
+
+    try:
+        if registry.active is None:
+            logger.warning("Model not available, using fallback heuristic checks for batch")
+            results = [heuristic_url_verdict(url) for url in urls]
+        else:
+            results = predict_urls_safety(urls)
+
+        return verdict_response({"count": len(results), "results": results}, negotiate_verdict_mimetype())
+
+    except Exception as e:
+        logger.error(f"Error in check_urls endpoint: {e}")
+        logger.error(traceback.format_exc())
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+# Streaming scan - NDJSON in, NDJSON out, scored in micro-batches
+STREAM_BATCH_SIZE = int(os.environ.get('STREAM_BATCH_SIZE', 256))
+STREAM_MAX_LINE_BYTES = int(os.environ.get('STREAM_MAX_LINE_BYTES', 16384))
+
+def parse_stream_line(line):
+    """Return the URL held by one NDJSON line (a JSON string, an object with 'url' or a bare URL)"""
+    line = line.strip()
+    if not line:
+        return None
+    if line[:1] in (b'{', b'"'):
+        record = json.loads(line)
+        url = record.get('url') if isinstance(record, dict) else record
+        if not isinstance(url, str):
+            raise ValueError("expected a string or an object with a 'url' field")
+        return url
+    return line.decode('utf-8', errors='replace')
+
+def read_stream_lines(stream, max_line_bytes):
+    """Yield (line, error) pairs without ever buffering more than one line"""
+    while True:
+        line = stream.readline(max_line_bytes + 1)
+        if not line:
+            return
+        if len(line) > max_line_bytes and not line.endswith(b'\n'):
+            # Skip the rest of an oversized line in bounded reads
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(max_line_bytes)
+            yield None, f"Line longer than {max_line_bytes} bytes"
+            continue
+        yield line, None
+
+def score_stream_batch(batch):
+    """Serialize verdicts for one micro-batch of (line number, url, error) entries"""
+    to_score = [(n, url) for n, url, error in batch if error is None]
+    if registry.active is None:
+        verdicts = [heuristic_url_verdict(url) for _, url in to_score]
+    elif to_score:
+        # A stream holds at most one scoring slot, so it cannot crowd out check-url
+        verdicts = admit_and_score_batch([url for _, url in to_score])
+    else:
+        verdicts = []
+    verdict_by_line = dict(zip((n for n, _ in to_score), verdicts))
+
+    out = []
+    for n, url, error in batch:
+        if error is not None:
+            record = {"line": n, "error": error}
+        else:
+            record = dict(verdict_by_line[n], line=n)
+        out.append(json.dumps(record))
+    return ''.join(line + '\n' for line in out)
+
+@app.route('/api/v1/scan-stream', methods=['POST'])
+def scan_stream():
+    # Read the body lazily: the next batch is only read once the previous
+    # one has been written, so a slow client also slows down the upload
+    stream = request.stream
+
+    def generate():
+        batch = []
+        scored = 0
+        for n, (line, error) in enumerate(read_stream_lines(stream, STREAM_MAX_LINE_BYTES)):
+            url = None
+            if error is None:
+                try:
+                    url = parse_stream_line(line)
+                except (ValueError, RecursionError) as e:
+                    # RecursionError: JSON nested deeper than the decoder allows
+                    error = f"Invalid input line: {e}"
+                if url is None and error is None:
+                    continue
+            batch.append((n, url, error))
+            if len(batch) >= STREAM_BATCH_SIZE:
+                yield score_stream_batch(batch)
+                scored += len(batch)
+                batch = []
+        if batch:
+            yield score_stream_batch(batch)
+            scored += len(batch)
+        logger.debug('Streamed verdicts for %d URLs', scored)
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson',
+                    headers={'X-Accel-Buffering': 'no'})
+
 def heuristic_url_check(url):
     """Basic heuristic check for URL safety when model is unavailable"""
+    return jsonify(heuristic_url_verdict(url))
+
+def heuristic_url_verdict(url):
+    """Heuristic verdict as a plain dict, shared by single and batch checks"""
     try:
-        # Common safe domains
-        safe_domains = [
-            'google.com', 'microsoft.com', 'apple.com', 'amazon.com',
-            'facebook.com', 'twitter.com', 'instagram.com', 'linkedin.com',
-            'youtube.com', 'github.com', 'stackoverflow.com', 'wikipedia.org'
-        ]
-        
         parsed_url = urlparse(url)
         hostname = parsed_url.hostname if parsed_url.hostname else ''
+
+        # Blocklisted and allowlisted hosts need no further checks
+        listed = domain_list_verdict(url, hostname)
+        if listed is not None:
+            return listed
+        host = host_info(hostname)
         
         # Check for IP address in hostname (suspicious)
-        ip_pattern = re.compile(r'\d+\.\d+\.\d+\.\d+')
-        has_ip = bool(ip_pattern.match(hostname))
+        has_ip = bool(host.ip)
         
         # Check for excessive subdomains (suspicious)
-        subdomain_count = hostname.count('.')
+        subdomain_count = host.subdomains
         
         # Check for common safe domains
-        is_common_safe = any(hostname.endswith('.' + domain) or hostname == domain for domain in safe_domains)
+        is_common_safe = host.common_safe
         
         # Check for suspicious keywords in URL
-        suspicious_keywords = ['free', 'win', 'lucky', 'prize', 'money', 'loan', 'password', 'login', 'bank']
-        has_suspicious_keywords = any(keyword in url.lower() for keyword in suspicious_keywords)
+        keywords = keyword_matcher.find(url)
+        has_suspicious_keywords = bool(keywords)
         
         # Make decision based on heuristics
         if is_common_safe and not has_suspicious_keywords:
@@ -415,31 +2364,36 @@ def heuristic_url_check(url):
         elif has_ip or subdomain_count > 3 or has_suspicious_keywords:
             confidence = 0.7
             details = "This URL has suspicious characteristics. Proceed with caution (fallback check)."
+            if keywords:
+                details = f"This URL contains suspicious keywords ({', '.join(keywords)}). Proceed with caution (fallback check)."
             is_safe = False
         else:
             confidence = 0.5
             details = "Could not verify safety with full model. Proceed with caution (fallback check)."
             is_safe = False
             
-        return jsonify({
+        result = {
             "url": url,
             "is_safe": is_safe,
             "confidence": confidence,
             "details": details
-        })
+        }
+        if keywords:
+            result["keywords"] = keywords
+        return result
             
     except Exception as e:
         logger.error(f"Error in heuristic check: {e}")
-        return jsonify({
+        return {
             "url": url,
             "is_safe": False,
             "confidence": 0.0,
             "details": "Error analyzing URL safety"
-        })
+        }
 
 if __name__ == '__main__':
     # Get all available IPs for logging
-    network_info = get_network_info()
+    network_info = network_snapshot.info
     logger.info(f"Starting server - available on the following IPs:")
     for ip in network_info['all_ips']:
         logger.info(f"  http://{ip}:8000")
@@ -457,6 +2411,10 @@ if __name__ == '__main__':
     
     # Enable debug mode for more useful error messages
     app.debug = True
+
+    # Start the inference processes up front, in the reloader's serving process only
+    if inference_pool is not None and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        threading.Thread(target=inference_pool.warm_up, name='inference-pool-warm-up', daemon=True).start()
     
     # Run the app - bind to all network interfaces explicitly
     app.run(host='0.0.0.0', port=8000, threaded=True) 
\ No newline at end of file
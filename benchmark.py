@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+"""Microbenchmarks for the URL scoring hot path.
+
+Everything runs in-process (the HTTP endpoint goes through the Flask test
+client), so results do not depend on the network. The URL corpus is
+synthetic and seeded, so runs are reproducible between commits.
+
+    python benchmark.py -o bench.json
+    python benchmark.py --compare bench.json --threshold 0.10
+
+Results are written as JSON: one entry per benchmark with throughput and
+latency percentiles in microseconds. With --compare, the p50 of every
+benchmark is checked against a previous results file and the exit status
+is non-zero if any got slower by more than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import string
+import sys
+import time
+
+# Keep request logging out of the measurements
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ.setdefault('VERDICT_CACHE_SIZE', '0')
+
+import numpy as np
+import app
+from keyword_matcher import KeywordMatcher
+from url_corpus import make_corpus
+
+def measure(fn, inputs, repeat):
+    """Call fn once per input, repeat times over the inputs, and return per-call nanoseconds"""
+    for value in inputs[:50]:
+        fn(value)
+    samples = []
+    clock = time.perf_counter_ns
+    for _ in range(repeat):
+        for value in inputs:
+            start = clock()
+            fn(value)
+            samples.append(clock() - start)
+    return np.array(samples, dtype=float)
+
+def summarize(samples, items_per_call=1):
+    us = samples / 1000.0
+    return {
+        "calls": int(len(us)),
+        "throughput_per_s": round(items_per_call * len(us) / (us.sum() / 1e6), 1),
+        "mean_us": round(float(us.mean()), 2),
+        "p50_us": round(float(np.percentile(us, 50)), 2),
+        "p90_us": round(float(np.percentile(us, 90)), 2),
+        "p99_us": round(float(np.percentile(us, 99)), 2),
+        "max_us": round(float(us.max()), 2),
+    }
+
+def make_keywords(count, seed=0):
+    """Synthetic brand/lure dictionary that always contains the built-in keywords"""
+    rng = random.Random(seed)
+    words = set(app.DEFAULT_SUSPICIOUS_KEYWORDS)
+    while len(words) < count:
+        words.add(''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12))))
+    return list(words)
+
+def run_benchmarks(corpus_size, repeat, batch_size, seed, keyword_sizes=()):
+    corpus = make_corpus(corpus_size, seed)
+    urls = [url for _, url in corpus]
+    results = {}
+    bundle = app.registry.active
+    model_ready = bundle is not None
+
+    # Feature extraction, per corpus category and overall
+    results['extract_features'] = summarize(measure(app.extract_features, urls, repeat))
+    for category in sorted({c for c, _ in corpus}):
+        subset = [url for c, url in corpus if c == category]
+        results[f'extract_features[{category}]'] = summarize(measure(app.extract_features, subset, repeat))
+
+    row = np.empty((1, app.N_FEATURES))
+    results['extract_features_into'] = summarize(measure(lambda u: app.extract_features_into(u, row), urls, repeat))
+    results['heuristic_url_check'] = summarize(measure(app.heuristic_url_verdict, urls, repeat))
+
+    # Keyword matching cost should stay flat as the dictionary grows
+    for size in keyword_sizes:
+        matcher = KeywordMatcher(make_keywords(size, seed))
+        results[f'keyword_matcher[words={size}]'] = summarize(measure(matcher.find, urls, repeat))
+
+    client = app.app.test_client()
+    if model_ready:
+        rows = [app.extract_features_into(url, np.empty((1, app.N_FEATURES))) for url in urls]
+        results['scaler_transform'] = summarize(measure(bundle.scaler.transform, rows, repeat))
+        scaled = [bundle.scaler.transform(r) for r in rows]
+        results['model_predict_proba[sklearn]'] = summarize(measure(bundle.model.predict_proba, scaled, repeat))
+        results[f'model_predict_proba[{bundle.engine.name}]'] = summarize(measure(bundle.engine.predict_proba, rows, repeat))
+        results['predict_url_safety'] = summarize(measure(app.predict_url_safety, urls, repeat))
+
+        batches = [urls[i:i + batch_size] for i in range(0, len(urls), batch_size)]
+        results[f'predict_urls_safety[batch={batch_size}]'] = summarize(
+            measure(app.predict_urls_safety, batches, repeat), items_per_call=batch_size)
+
+    results['endpoint_check_url'] = summarize(
+        measure(lambda u: client.get('/api/v1/check-url', query_string={'url': u}), urls, repeat))
+    return results, model_ready
+
+def compare(results, baseline, threshold):
+    """Print p50 changes against a baseline and return the names that regressed"""
+    regressions = []
+    print(f"{'benchmark':45s} {'base p50':>10s} {'p50':>10s} {'change':>8s}", file=sys.stderr)
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        change = current['p50_us'] / previous['p50_us'] - 1 if previous['p50_us'] else 0.0
+        flag = ' REGRESSION' if change > threshold else ''
+        print(f"{name:45s} {previous['p50_us']:10.2f} {current['p50_us']:10.2f} {change:+8.1%}{flag}", file=sys.stderr)
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the URL scoring hot path")
+    parser.add_argument('--corpus-size', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3, help="Passes over the corpus per benchmark")
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keyword-sizes', default='9,1000,10000,50000',
+                        help="Comma-separated dictionary sizes for the keyword matcher benchmark")
+    parser.add_argument('-o', '--output', help="Write JSON results to this file instead of stdout")
+    parser.add_argument('--compare', help="Previous JSON results to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Allowed p50 slowdown before failing")
+    args = parser.parse_args()
+
+    keyword_sizes = [int(n) for n in args.keyword_sizes.split(',') if n]
+    results, model_ready = run_benchmarks(args.corpus_size, args.repeat, args.batch_size, args.seed, keyword_sizes)
+    bundle = app.registry.active
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sklearn": app.sklearn_version,
+            "numpy": np.__version__,
+            "model_loaded": model_ready,
+            "model_version": bundle.version if bundle is not None else None,
+            "engine": bundle.engine.name if bundle is not None else None,
+            "corpus_size": args.corpus_size,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
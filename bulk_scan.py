@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+"""Offline bulk URL scanner.
+
+Streams URLs from a newline- or JSONL-delimited file, scores them with the
+same feature extractor and model as the Flask API, and writes one JSON
+verdict per line. Input is processed in fixed-size chunks spread over a
+process pool, with a bounded number of chunks in flight, so memory use does
+not depend on the size of the input.
+
+    python bulk_scan.py proxy_urls.txt -o verdicts.jsonl
+    python bulk_scan.py requests.jsonl --format jsonl --url-field target -o out.jsonl
+    python bulk_scan.py proxy_urls.txt -o verdicts.jsonl --resume
+
+A checkpoint (<output>.checkpoint) is written after every chunk. With
+--resume the output is truncated back to the last checkpoint and scanning
+continues from the recorded input line. The persistent verdict store is
+never used, even with VERDICT_STORE_PATH set.
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+
+# Keep the per-request DEBUG logging of app.py out of bulk runs
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+# Offline corpora must not fill the shared verdict store, skew its hit
+# counts or end up preloaded into the servers' caches
+os.environ.pop('VERDICT_STORE_PATH', None)
+
+import app
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Classify a large file of URLs offline")
+    parser.add_argument('input', help="Input file, or - for stdin")
+    parser.add_argument('-o', '--output', required=True, help="Output JSONL file")
+    parser.add_argument('--format', choices=['auto', 'lines', 'jsonl'], default='auto',
+                        help="Input format (default: auto-detect per line)")
+    parser.add_argument('--url-field', default='url', help="Field holding the URL in JSONL input")
+    parser.add_argument('--chunk-size', type=int, default=5000, help="URLs scored per task")
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                        help="Number of worker processes")
+    parser.add_argument('--resume', action='store_true', help="Continue from the last checkpoint")
+    return parser.parse_args()
+
+def parse_line(line, input_format, url_field):
+    """Return the URL held by one input line, or None for blank lines"""
+    line = line.strip()
+    if not line:
+        return None
+    if input_format == 'jsonl' or (input_format == 'auto' and line.startswith('{')):
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError(f"expected a JSON object with a '{url_field}' field")
+        url = record.get(url_field)
+        if url is not None and not isinstance(url, str):
+            raise ValueError(f"'{url_field}' is not a string")
+        return url
+    return line
+
+def score_chunk(task):
+    """Score one chunk in a worker process and return its serialized output"""
+    start_line, lines, input_format, url_field = task
+    urls = []
+    errors = {}
+    for offset, line in enumerate(lines):
+        try:
+            urls.append(parse_line(line, input_format, url_field))
+        except ValueError as e:
+            urls.append(None)
+            errors[offset] = f"Invalid input line: {e}"
+
+    to_score = [(offset, url) for offset, url in enumerate(urls) if url]
+    if app.registry.active is not None:
+        verdicts = app.predict_urls_safety([url for _, url in to_score])
+    else:
+        verdicts = [app.heuristic_url_verdict(url) for _, url in to_score]
+
+    output = []
+    verdict_by_offset = dict(zip((offset for offset, _ in to_score), verdicts))
+    for offset, url in enumerate(urls):
+        if offset in verdict_by_offset:
+            record = dict(verdict_by_offset[offset], line=start_line + offset)
+        elif offset in errors:
+            record = {"line": start_line + offset, "error": errors[offset]}
+        else:
+            continue
+        output.append(json.dumps(record))
+    return ''.join(line + '\n' for line in output)
+
+def read_checkpoint(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def write_checkpoint(path, offset, output_bytes):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({"offset": offset, "output_bytes": output_bytes}, f)
+    os.replace(tmp_path, path)
+
+def chunked(lines, size):
+    while True:
+        chunk = list(itertools.islice(lines, size))
+        if not chunk:
+            return
+        yield chunk
+
+def main():
+    args = parse_args()
+    checkpoint_path = args.output + '.checkpoint'
+
+    start_offset = 0
+    output_bytes = 0
+    checkpoint = read_checkpoint(checkpoint_path) if args.resume else None
+    if checkpoint:
+        start_offset = checkpoint['offset']
+        output_bytes = checkpoint['output_bytes']
+        print(f"Resuming at input line {start_offset}", file=sys.stderr)
+
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8', errors='replace')
+    output = open(args.output, 'r+' if checkpoint else 'w', encoding='utf-8')
+    # Drop anything written after the last checkpoint
+    output.seek(output_bytes)
+    output.truncate()
+
+    lines = itertools.islice(source, start_offset, None)
+    offset = start_offset
+    started = time.time()
+
+    # Forked workers inherit the model already loaded by importing app
+    with multiprocessing.get_context('fork').Pool(args.workers) as pool:
+        in_flight = deque()
+        max_in_flight = args.workers * 2
+
+        def drain_one():
+            nonlocal offset
+            chunk_length, result = in_flight.popleft()
+            output.write(result.get())
+            output.flush()
+            offset += chunk_length
+            write_checkpoint(checkpoint_path, offset, output.tell())
+            elapsed = time.time() - started
+            print(f"\r{offset} lines ({(offset - start_offset) / max(elapsed, 1e-9):.0f} lines/s)",
+                  end='', file=sys.stderr)
+
+        for start, chunk in zip(itertools.count(start_offset, args.chunk_size),
+                                chunked(lines, args.chunk_size)):
+            in_flight.append((len(chunk), pool.apply_async(
+                score_chunk, ((start, chunk, args.format, args.url_field),))))
+            # Bound memory by keeping only a few chunks queued per worker
+            while len(in_flight) >= max_in_flight:
+                drain_one()
+        while in_flight:
+            drain_one()
+
+    output.close()
+    if source is not sys.stdin:
+        source.close()
+    print(f"\nDone: {offset - start_offset} lines in {time.time() - started:.1f}s", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+"""Cheap first-tier scorer for the inference cascade.
+
+URLs that are not answered by the domain lists or the verdict cache go
+through a logistic regression on a handful of character counts that need
+no URL parsing or regex scans. Only when its probability falls between the
+safe and malicious thresholds does the URL pay for the full feature
+extraction and model.
+
+The scorer is distilled from the full model: it is fitted on the full
+model's labels for a corpus of URLs, its thresholds are the widest that
+keep agreement with the full model above a target on that corpus, and the
+agreement of every tier is reported on a held-out split.
+
+    python cascade.py build urls.txt --target-agreement 0.995
+    python cascade.py evaluate urls.txt
+
+The result is saved next to the model (Malicious-URL-Detection/cascade.joblib)
+and records the model version it was built for, so a retrained model never
+uses a stale cascade.
+"""
+import argparse
+import hashlib
+import json
+import math
+import operator
+import os
+import sys
+import time
+
+import numpy as np
+from joblib import dump, load
+
+# Subset of the model features that are plain str.count scans of the URL
+CHEAP_FEATURES = (
+    'length_url', 'nb_dots', 'nb_hyphens', 'nb_at', 'nb_qm', 'nb_and', 'nb_eq',
+    'nb_percent', 'nb_slash', 'nb_dslash', 'nb_www', 'nb_com', 'ratio_digits_url'
+)
+ASCII_DIGITS = str.maketrans('', '', '0123456789')
+
+def cheap_features(url):
+    """Values of CHEAP_FEATURES for one URL, identical to the full extractor's"""
+    count = url.count
+    length = len(url)
+    if url.isascii():
+        digits = length - len(url.translate(ASCII_DIGITS))
+    else:
+        digits = sum(c.isdigit() for c in url)
+    return (length, count('.'), count('-'), count('@'), count('?'), count('&'), count('='),
+            count('%'), count('/'), count('//'), count('www'), count('.com'), digits / length)
+
+class Cascade:
+    def __init__(self, coef, intercept, safe_threshold, malicious_threshold, model_version, report=None):
+        # Plain floats: a Python dot product beats NumPy for one short row
+        self.coef = [float(c) for c in coef]
+        self.intercept = float(intercept)
+        self.safe_threshold = float(safe_threshold)
+        self.malicious_threshold = float(malicious_threshold)
+        self.model_version = model_version
+        self.report = report or {}
+
+    @classmethod
+    def load(cls, path):
+        state = load(path)
+        if tuple(state['features']) != CHEAP_FEATURES:
+            raise ValueError(f"cascade was built for features {state['features']}")
+        return cls(state['coef'], state['intercept'], state['safe_threshold'],
+                   state['malicious_threshold'], state['model_version'], state.get('report'))
+
+    def save(self, path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        dump({
+            'features': CHEAP_FEATURES,
+            'coef': self.coef,
+            'intercept': self.intercept,
+            'safe_threshold': self.safe_threshold,
+            'malicious_threshold': self.malicious_threshold,
+            'model_version': self.model_version,
+            'report': self.report,
+        }, tmp_path)
+        os.replace(tmp_path, path)
+
+    def probability(self, url):
+        """Cheap estimate of P(malicious)"""
+        z = self.intercept + sum(map(operator.mul, self.coef, cheap_features(url)))
+        return 1.0 / (1.0 + math.exp(-min(max(z, -50.0), 50.0)))
+
+    def probabilities(self, X):
+        z = X @ np.asarray(self.coef) + self.intercept
+        return 1.0 / (1.0 + np.exp(-np.clip(z, -50.0, 50.0)))
+
+    def decide(self, url):
+        """(is_malicious, confidence) when the cheap tier is confident, else None"""
+        p = self.probability(url)
+        if p < self.safe_threshold:
+            return False, 1.0 - p
+        if p > self.malicious_threshold:
+            return True, p
+        return None
+
+    def fingerprint(self):
+        """Short digest of everything that decides the cascade's answers"""
+        state = json.dumps([self.coef, self.intercept, self.safe_threshold, self.malicious_threshold])
+        return hashlib.sha1(state.encode()).hexdigest()[:8]
+
+    def stats(self):
+        return {
+            "fingerprint": self.fingerprint(),
+            "features": list(CHEAP_FEATURES),
+            "safe_threshold": self.safe_threshold,
+            "malicious_threshold": self.malicious_threshold,
+            "model_version": self.model_version,
+            "report": self.report
+        }
+
+def fit_scorer(X, labels):
+    """Logistic regression on standardized cheap features, folded back to raw units"""
+    from sklearn.linear_model import LogisticRegression
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+    lr = LogisticRegression(max_iter=1000, C=1.0).fit((X - mean) / scale, labels)
+    coef = lr.coef_[0] / scale
+    intercept = lr.intercept_[0] - float(np.dot(coef, mean))
+    return coef, intercept
+
+def pick_thresholds(p, labels, target):
+    """Widest early-exit thresholds whose exits agree with the full model at least target of the time"""
+    n = len(p)
+    ranks = np.arange(1, n + 1)
+
+    # Safe exits take the lowest probabilities first
+    order = np.argsort(p, kind='stable')
+    agreement = np.cumsum(labels[order] == 0) / ranks
+    ok = np.flatnonzero(agreement >= target)
+    safe_threshold = float(np.nextafter(p[order[ok[-1]]], 1.0)) if len(ok) else 0.0
+
+    # Malicious exits take the highest probabilities first
+    order = order[::-1]
+    agreement = np.cumsum(labels[order] == 1) / ranks
+    ok = np.flatnonzero(agreement >= target)
+    malicious_threshold = float(np.nextafter(p[order[ok[-1]]], 0.0)) if len(ok) else 1.0
+
+    # The two ranges must not overlap
+    if safe_threshold > malicious_threshold:
+        safe_threshold = malicious_threshold = float(np.median(p))
+    return safe_threshold, malicious_threshold
+
+def tier_report(urls, p, labels, safe_threshold, malicious_threshold, listed):
+    """Coverage of every tier and its agreement with the full model"""
+    n = len(urls)
+    report = {"urls": n}
+
+    # Tier 0: domain lists
+    list_rows = [i for i, verdict in enumerate(listed) if verdict is not None]
+    list_agree = sum((not listed[i]["is_safe"]) == bool(labels[i]) for i in list_rows)
+    report["domain_list"] = {
+        "coverage": round(len(list_rows) / n, 4) if n else 0.0,
+        "agreement": round(list_agree / len(list_rows), 4) if list_rows else None
+    }
+
+    # Tier 1: cheap scorer, on what the lists did not answer
+    remaining = np.ones(n, dtype=bool)
+    remaining[list_rows] = False
+    safe_exit = remaining & (p < safe_threshold)
+    malicious_exit = remaining & (p > malicious_threshold)
+    exits = safe_exit | malicious_exit
+    agree = (safe_exit & (labels == 0)) | (malicious_exit & (labels == 1))
+    report["cheap_scorer"] = {
+        "coverage": round(float(exits.sum()) / n, 4) if n else 0.0,
+        "agreement": round(float(agree.sum()) / exits.sum(), 4) if exits.any() else None,
+        "safe_exits": int(safe_exit.sum()),
+        "malicious_exits": int(malicious_exit.sum())
+    }
+
+    # Tier 2: the full model agrees with itself
+    full = remaining & ~exits
+    report["full_model"] = {"coverage": round(float(full.sum()) / n, 4) if n else 0.0, "agreement": 1.0}
+    cascade_agree = list_agree + int(agree.sum()) + int(full.sum())
+    report["cascade_agreement"] = round(cascade_agree / n, 4) if n else None
+    return report
+
+def read_urls(path, limit=None):
+    urls = []
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('{'):
+                line = json.loads(line).get('url') or ''
+            if not line:
+                continue
+            if not line.startswith(('http://', 'https://')):
+                line = 'https://' + line
+            urls.append(line)
+            if limit and len(urls) >= limit:
+                break
+    return urls
+
+def label_and_featurize(app, urls, chunk_size=10000):
+    """Full model labels, cheap feature matrix and domain-list verdicts for a URL list"""
+    bundle = app.registry.active
+    # The app scores URLs in normalized form, so the tier is fitted on the same
+    urls = [app.normalize_url(url) for url in urls]
+    labels = np.empty(len(urls), dtype=int)
+    for start in range(0, len(urls), chunk_size):
+        chunk = urls[start:start + chunk_size]
+        probabilities = bundle.engine.predict_proba(app.extract_features_batch(chunk))
+        labels[start:start + len(chunk)] = bundle.engine.classes[np.argmax(probabilities, axis=1)]
+    X = np.array([cheap_features(url) for url in urls], dtype=float)
+    listed = [app.domain_list_verdict(url) for url in urls]
+    return labels, X, listed
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or evaluate the cheap cascade tier")
+    parser.add_argument('command', choices=['build', 'evaluate'])
+    parser.add_argument('urls', help="URL corpus, one URL (or JSON object with 'url') per line")
+    parser.add_argument('-o', '--output', help="Cascade file (default: CASCADE_FILE next to the model)")
+    parser.add_argument('--target-agreement', type=float, default=0.995,
+                        help="Minimum agreement with the full model for early exits")
+    parser.add_argument('--holdout', type=float, default=0.3, help="Share of URLs kept for validation")
+    parser.add_argument('--limit', type=int, help="Use at most this many URLs")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # Keep the per-request DEBUG logging of app.py out of the run
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    import app
+
+    if app.registry.active is None:
+        print("No model loaded, nothing to distill from", file=sys.stderr)
+        sys.exit(1)
+    path = args.output or app.CASCADE_FILE
+    urls = read_urls(args.urls, args.limit)
+    started = time.time()
+    labels, X, listed = label_and_featurize(app, urls)
+    print(f"Labelled {len(urls)} URLs with the full model in {time.time() - started:.1f}s", file=sys.stderr)
+
+    if args.command == 'evaluate':
+        cascade = Cascade.load(path)
+        if cascade.model_version != app.registry.active.version:
+            print(f"Warning: cascade was built for model {cascade.model_version}, "
+                  f"active model is {app.registry.active.version}", file=sys.stderr)
+        report = tier_report(urls, cascade.probabilities(X), labels, cascade.safe_threshold,
+                             cascade.malicious_threshold, listed)
+        print(json.dumps(report, indent=2))
+        return
+
+    if len(set(labels.tolist())) < 2:
+        print("The full model gives a single label on this corpus, cannot fit a scorer", file=sys.stderr)
+        sys.exit(1)
+    rng = np.random.default_rng(args.seed)
+    holdout = rng.random(len(urls)) < args.holdout
+    train = ~holdout
+    coef, intercept = fit_scorer(X[train], labels[train])
+    cascade = Cascade(coef, intercept, 0.0, 1.0, app.registry.active.version)
+    cascade.safe_threshold, cascade.malicious_threshold = pick_thresholds(
+        cascade.probabilities(X[train]), labels[train], args.target_agreement)
+
+    held = np.flatnonzero(holdout)
+    cascade.report = tier_report([urls[i] for i in held], cascade.probabilities(X[held]), labels[held],
+                                 cascade.safe_threshold, cascade.malicious_threshold,
+                                 [listed[i] for i in held])
+    cascade.report["target_agreement"] = args.target_agreement
+    cascade.save(path)
+    print(json.dumps(cascade.stats(), indent=2))
+    print(f"Saved cascade to {path}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""Hashed domain-suffix index for allowlists and blocklists.
+
+Every listed domain is stored as a 64-bit hash in an open-addressing table
+held in a flat uint64 array. A host matches when any of its label suffixes
+(a.b.example.com, b.example.com, example.com, com) is in the table, so a
+lookup costs one hash and a few probes per host label no matter how many
+domains are listed.
+
+The table is saved as a .npy file and memory-mapped read-only, so every
+worker process shares one copy through the page cache. Text lists are
+compiled to <list>.npy next to the source on first use, or ahead of time:
+
+    python domain_index.py build blocklist.txt
+    python domain_index.py lookup blocklist.txt login.evil.example.com
+"""
+import hashlib
+import os
+import sys
+
+import numpy as np
+
+def domain_hash(domain):
+    """Stable 64-bit hash of a domain, never 0 (0 marks an empty slot)"""
+    value = int.from_bytes(hashlib.blake2b(domain.encode('utf-8'), digest_size=8).digest(), 'little')
+    return value or 1
+
+def clean_domain(line):
+    """Normalize one list entry, or return None for blanks and comments"""
+    domain = line.split('#', 1)[0].strip().lower().rstrip('.')
+    if domain.startswith('*.'):
+        domain = domain[2:]
+    domain = domain.lstrip('.')
+    return domain or None
+
+def build_table(hashes):
+    """Open-addressing table (linear probing, load factor <= 0.5) for a uint64 hash array"""
+    hashes = np.unique(np.asarray(hashes, dtype=np.uint64))
+    size = 1 << max(4, int(2 * len(hashes) - 1).bit_length())
+    mask = np.uint64(size - 1)
+    table = np.zeros(size, dtype=np.uint64)
+
+    # Place keys in rounds: the first key aiming at each free slot takes it,
+    # the rest move one slot on
+    positions = hashes & mask
+    pending = np.arange(len(hashes))
+    while len(pending):
+        free = table[positions] == 0
+        candidates = pending[free]
+        slots = positions[free]
+        _, first = np.unique(slots, return_index=True)
+        table[slots[first]] = hashes[candidates[first]]
+        placed = np.zeros(len(pending), dtype=bool)
+        placed[np.flatnonzero(free)[first]] = True
+        pending = pending[~placed]
+        positions = (positions[~placed] + np.uint64(1)) & mask
+    return table
+
+class DomainIndex:
+    def __init__(self, table=None, source=None):
+        # Plain ndarray view of a memmap avoids memmap overhead on every probe
+        self.table = np.asarray(table) if table is not None else np.zeros(16, dtype=np.uint64)
+        self.mask = len(self.table) - 1
+        self.size = int(np.count_nonzero(self.table))
+        self.source = source
+
+    @classmethod
+    def from_domains(cls, domains, source=None):
+        cleaned = (clean_domain(d) for d in domains)
+        hashes = np.fromiter((domain_hash(d) for d in cleaned if d), dtype=np.uint64)
+        return cls(build_table(hashes), source)
+
+    @classmethod
+    def from_file(cls, path):
+        """Load a compiled .npy table, compiling text lists next to the source when stale"""
+        if path.endswith('.npy'):
+            return cls(np.load(path, mmap_mode='r'), path)
+
+        compiled = path + '.npy'
+        if not os.path.exists(compiled) or os.path.getmtime(compiled) < os.path.getmtime(path):
+            with open(path, encoding='utf-8', errors='replace') as f:
+                index = cls.from_domains(f, path)
+            try:
+                index.save(compiled)
+            except OSError:
+                # Read-only location, keep the in-memory table
+                return index
+        return cls(np.load(compiled, mmap_mode='r'), path)
+
+    def save(self, path):
+        # Write under a temporary name so other workers never map a partial file
+        tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, np.asarray(self.table))
+        os.replace(tmp_path, path)
+
+    def __len__(self):
+        return self.size
+
+    def _contains_hash(self, value):
+        table = self.table
+        mask = self.mask
+        i = value & mask
+        while True:
+            slot = int(table[i])
+            if slot == value:
+                return True
+            if slot == 0:
+                return False
+            i = (i + 1) & mask
+
+    def match(self, hostname):
+        """Return the listed suffix of hostname, or None"""
+        if not self.size or not hostname:
+            return None
+        hostname = hostname.lower().rstrip('.')
+        start = 0
+        while True:
+            suffix = hostname[start:]
+            if self._contains_hash(domain_hash(suffix)):
+                return suffix
+            dot = hostname.find('.', start)
+            if dot < 0:
+                return None
+            start = dot + 1
+
+    def __contains__(self, hostname):
+        return self.match(hostname) is not None
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ('build', 'lookup'):
+        print(__doc__)
+        sys.exit(1)
+    if sys.argv[1] == 'build':
+        path = sys.argv[2]
+        with open(path, encoding='utf-8', errors='replace') as f:
+            index = DomainIndex.from_domains(f, path)
+        index.save(path + '.npy')
+        print(f"Indexed {len(index)} domains into {path}.npy ({index.table.nbytes / 1e6:.1f} MB)")
+    else:
+        index = DomainIndex.from_file(sys.argv[2])
+        for host in sys.argv[3:]:
+            print(f"{host}: {index.match(host) or 'not listed'}")
+
+if __name__ == "__main__":
+    main()
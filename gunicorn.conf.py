@@ -0,0 +1,42 @@
+# Gunicorn settings for serving app.py with many workers per box.
+#
+#   gunicorn -c gunicorn.conf.py
+#
+# With preload_app the model is loaded once in the master and forked into
+# every worker, so its pages are shared copy-on-write instead of being
+# loaded 32 times. Combine with MODEL_MMAP=1 to also map the exported
+# inference arrays from disk.
+import gc
+import multiprocessing
+import os
+import sys
+import threading
+
+wsgi_app = 'app:app'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+# More threads than ADMISSION_MAX_IN_FLIGHT, so excess requests wait inside
+# the app where admission control can answer them degraded instead of in the
+# accept queue where nothing bounds their latency
+threads = int(os.environ.get('GUNICORN_THREADS', 16))
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+
+
+def when_ready(server):
+    # Move everything loaded in the master into the permanent generation so
+    # garbage collections in the workers do not write to (and un-share) it
+    gc.freeze()
+    server.log.info("Froze %d preloaded objects before forking workers", gc.get_freeze_count())
+
+
+def post_fork(server, worker):
+    server.log.info("Worker %s started (pid %s)", worker.age, worker.pid)
+
+
+def post_worker_init(worker):
+    # Start this worker's inference processes now rather than on its first
+    # request. The app is imported here even without preload_app.
+    app = sys.modules.get('app')
+    if getattr(app, 'inference_pool', None) is not None:
+        threading.Thread(target=app.inference_pool.warm_up, name='inference-pool-warm-up', daemon=True).start()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+"""Multi-core inference backend for the Flask app.
+
+Feature extraction is pure Python and holds the GIL, so one server process
+scores on one core however many request threads it has. With
+INFERENCE_POOL_WORKERS set, the app keeps domain lists, caches and response
+encoding in the HTTP process and ships feature extraction and the model to a
+pool of worker processes instead.
+
+Each pool worker imports the app once, loading the model itself, and then
+only receives URL batches packed as one UTF-8 blob plus a uint32 offset
+array. It answers with the raw float64 probability matrix, so neither side
+pickles per-URL objects.
+
+    python inference_pool.py --max-workers 8 --corpus-size 20000
+
+prints the throughput scaling curve from 1 to --max-workers processes.
+"""
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# The app module inside a pool worker
+_app = None
+
+def pack_urls(urls):
+    """One UTF-8 blob and the uint32 offsets of every URL in it"""
+    encoded = [url.encode('utf-8', 'surrogatepass') for url in urls]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint32)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return offsets.tobytes(), b''.join(encoded)
+
+def unpack_urls(offsets, blob):
+    offsets = np.frombuffer(offsets, dtype=np.uint32).tolist()
+    return [blob[start:end].decode('utf-8', 'surrogatepass') for start, end in zip(offsets, offsets[1:])]
+
+def _init_worker():
+    global _app
+    # Under spawn a server started as `python app.py` is already imported as __mp_main__
+    main = sys.modules.get('__mp_main__')
+    _app = main if hasattr(main, 'registry') else importlib.import_module('app')
+
+def _score(version, offsets, blob):
+    """Probabilities for one packed batch: (model version, float64 bytes, {row: error})"""
+    bundle = _app.registry.active
+    if bundle is None or bundle.version != version:
+        # The HTTP process moved to another model since this worker started
+        _app.registry.reload('inference-pool')
+        bundle = _app.registry.active
+        if bundle is None:
+            raise RuntimeError("model not available in inference worker")
+        if bundle.version != version:
+            # Never answer for a model the HTTP process did not ask for
+            raise RuntimeError(f"inference worker has model {bundle.version}, not {version}")
+    urls = unpack_urls(offsets, blob)
+    features = np.zeros((len(urls), _app.N_FEATURES))
+    errors = {}
+    for i, url in enumerate(urls):
+        try:
+            _app.extract_features_into(url, features[i])
+        except Exception as e:
+            errors[i] = str(e)
+    probabilities = np.ascontiguousarray(bundle.engine.predict_proba(features), dtype=np.float64)
+    return bundle.version, probabilities.tobytes(), errors
+
+class InferencePool:
+    def __init__(self, workers, chunk_size):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._executor = None
+        self._pid = None
+        self._warm_pid = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.urls = 0
+        self.failures = 0
+
+    def _ensure_executor(self):
+        # A pool does not survive fork, so each server process starts its own
+        if self._executor is not None and self._pid == os.getpid():
+            return self._executor
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # spawn, not fork: the HTTP process is multi-threaded
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                                     initializer=_init_worker)
+                self._pid = os.getpid()
+        return self._executor
+
+    def predict_proba(self, urls, version):
+        """((len(urls), 2) probabilities, {row: error}) computed by the pool with model version
+
+        Raises if any worker cannot score with that version.
+        """
+        executor = self._ensure_executor()
+        futures = [(start, executor.submit(_score, version, *pack_urls(urls[start:start + self.chunk_size])))
+                   for start in range(0, len(urls), self.chunk_size)]
+        probabilities = np.empty((len(urls), 2))
+        errors = {}
+        try:
+            for start, future in futures:
+                used_version, buffer, chunk_errors = future.result()
+                if used_version != version:
+                    raise RuntimeError(f"inference worker scored with model {used_version}, not {version}")
+                chunk = np.frombuffer(buffer, dtype=np.float64).reshape(-1, 2)
+                probabilities[start:start + len(chunk)] = chunk
+                errors.update({start + row: message for row, message in chunk_errors.items()})
+        except Exception:
+            for _, future in futures:
+                future.cancel()
+            with self._lock:
+                self.failures += 1
+            raise
+        with self._lock:
+            self.batches += len(futures)
+            self.urls += len(urls)
+            self._warm_pid = os.getpid()
+        return probabilities, errors
+
+    def warm_up(self):
+        """Start the worker processes so that first requests do not wait for model loading"""
+        executor = self._ensure_executor()
+        for future in [executor.submit(_init_worker) for _ in range(self.workers)]:
+            future.result()
+        self._warm_pid = os.getpid()
+
+    def warm(self):
+        return self._warm_pid == os.getpid()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "chunk_size": self.chunk_size,
+                "started": self._executor is not None and self._pid == os.getpid(),
+                "warm": self.warm(),
+                "batches": self.batches,
+                "urls": self.urls,
+                "failures": self.failures
+            }
+
+def scaling_curve(app, urls, max_workers, chunk_size, clients):
+    """URLs/s for the in-process path and for pools of 1..max_workers processes"""
+    bundle = app.registry.active
+    curve = []
+
+    start = time.perf_counter()
+    bundle.engine.predict_proba(app.extract_features_batch(urls))
+    baseline = len(urls) / (time.perf_counter() - start)
+    curve.append({"workers": 0, "label": "in-process", "urls_per_s": round(baseline, 1), "speedup": 1.0})
+
+    counts = sorted({n for n in (1, 2, 4, 8, 16, 32, 64) if n <= max_workers} | {max_workers})
+    for workers in counts:
+        pool = InferencePool(workers, chunk_size)
+        pool.warm_up()
+        # Concurrent callers, as request threads would be
+        batches = [urls[i:i + chunk_size] for i in range(0, len(urls), chunk_size)]
+        pool.predict_proba(batches[0], bundle.version)
+        start = time.perf_counter()
+        threads = [threading.Thread(target=lambda part: [pool.predict_proba(b, bundle.version) for b in part],
+                                    args=(batches[i::clients],)) for i in range(clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        rate = len(urls) / (time.perf_counter() - start)
+        pool.shutdown()
+        curve.append({"workers": workers, "urls_per_s": round(rate, 1), "speedup": round(rate / baseline, 2)})
+        print(f"{workers:3d} workers: {rate:10.1f} URLs/s ({rate / baseline:.2f}x in-process)", file=sys.stderr)
+    return curve
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure inference pool throughput from 1 to N processes")
+    parser.add_argument('--max-workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--corpus-size', type=int, default=20000)
+    parser.add_argument('--chunk-size', type=int, default=256, help="URLs per task sent to a worker")
+    parser.add_argument('--clients', type=int, help="Concurrent callers (default: 2 per worker at the largest size)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help="Write the JSON curve to this file instead of stdout")
+    args = parser.parse_args()
+
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.environ.setdefault('VERDICT_CACHE_SIZE', '0')
+    from benchmark import app, make_corpus
+
+    if app.registry.active is None:
+        print("No model loaded, nothing to measure", file=sys.stderr)
+        sys.exit(1)
+    urls = [url for _, url in make_corpus(args.corpus_size, args.seed)]
+    curve = scaling_curve(app, urls, args.max_workers, args.chunk_size, args.clients or 2 * args.max_workers)
+    report = {
+        "meta": {
+            "cpu_count": multiprocessing.cpu_count(),
+            "model_version": app.registry.active.version,
+            "engine": app.registry.active.engine.name,
+            "corpus_size": args.corpus_size,
+            "chunk_size": args.chunk_size,
+        },
+        "curve": curve
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""Aho-Corasick multi-pattern matcher for suspicious URL keywords.
+
+The automaton is built once from the word list. Matching makes a single
+pass over the lowercased text and follows at most one failure link per
+character on average, so its cost depends on the URL length and not on
+how many words are listed.
+
+    python keyword_matcher.py words.txt https://free-prize.example/login
+"""
+import sys
+from collections import deque
+
+class KeywordMatcher:
+    def __init__(self, words):
+        self.words = sorted({w.strip().lower() for w in words if w and w.strip()})
+
+        # Trie transitions, failure links and the words ending at each state
+        goto = [{}]
+        output = [()]
+        for word in self.words:
+            state = 0
+            for ch in word:
+                next_state = goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][ch] = next_state
+                    goto.append({})
+                    output.append(())
+                state = next_state
+            output[state] = (word,)
+
+        fail = [0] * len(goto)
+        pending = deque(goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for ch, next_state in goto[state].items():
+                pending.append(next_state)
+                fallback = fail[state]
+                while fallback and ch not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(ch, 0)
+                # Words ending at the failure state also end here
+                output[next_state] = output[next_state] + output[fail[next_state]]
+
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+
+    @classmethod
+    def from_file(cls, path):
+        """One word per line, blank lines and # comments ignored"""
+        with open(path, encoding='utf-8', errors='replace') as f:
+            return cls(line.split('#', 1)[0] for line in f)
+
+    def __len__(self):
+        return len(self.words)
+
+    def find(self, text):
+        """Return the distinct listed words found in text, in order of first match"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        found = {}
+        state = 0
+        for ch in text.lower():
+            transitions = goto[state]
+            while state and ch not in transitions:
+                state = fail[state]
+                transitions = goto[state]
+            state = transitions.get(ch, 0)
+            if output[state]:
+                for word in output[state]:
+                    found[word] = None
+        return list(found)
+
+def main():
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+    matcher = KeywordMatcher.from_file(sys.argv[1])
+    for text in sys.argv[2:]:
+        print(f"{text}: {', '.join(matcher.find(text)) or 'no matches'}")
+
+if __name__ == "__main__":
+    main()
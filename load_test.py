@@ -0,0 +1,341 @@
+#!/usr/bin/env python
+"""End-to-end load generator and soak harness.
+
+Starts app.py under gunicorn on a local port (or targets a running server
+with --target), then drives /api/v1/check-url and /api/health with a fixed
+request mix at each concurrency step. Every client thread replays the same
+seeded URL corpus, so runs are repeatable between commits and machines.
+
+    python load_test.py --concurrency 1,4,16,64 --duration 20
+    python load_test.py --corpus urls.txt --mix check-url=90,health=10 -o load.json
+    python load_test.py --concurrency 32 --duration 3600 --workers 8    # soak
+
+For every step it reports throughput, p50/p95/p99/p999 latency, error
+rates and status codes, plus the resident memory of every gunicorn worker
+sampled over the run. The step where throughput stops growing is reported
+as the saturation point.
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+import numpy as np
+from url_corpus import make_corpus
+
+ENDPOINTS = {
+    'check-url': lambda url: '/api/v1/check-url?url=' + quote(url, safe=''),
+    'health': lambda url: '/api/health',
+    'livez': lambda url: '/livez',
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load test the URL safety API under gunicorn")
+    parser.add_argument('--target', help="Base URL of a running server (default: start gunicorn locally)")
+    parser.add_argument('--server-pid', type=int, help="Master pid of a running server, for worker RSS sampling")
+    parser.add_argument('--concurrency', default='1,4,16,64', help="Comma-separated client concurrency steps")
+    parser.add_argument('--duration', type=float, default=20, help="Seconds per concurrency step")
+    parser.add_argument('--warmup', type=float, default=2, help="Seconds of unrecorded load before each step")
+    parser.add_argument('--mix', default='check-url=95,health=5',
+                        help=f"Weighted endpoint mix, endpoints: {', '.join(ENDPOINTS)}")
+    parser.add_argument('--corpus', help="URL file, one per line (default: seeded synthetic corpus)")
+    parser.add_argument('--corpus-size', type=int, default=20000)
+    parser.add_argument('--save-corpus', help="Write the URL corpus used to this file")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--client-processes', type=int, default=max(1, multiprocessing.cpu_count() // 2),
+                        help="Processes the client threads are spread over")
+    parser.add_argument('--timeout', type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument('--workers', type=int, default=2, help="gunicorn workers (local server only)")
+    parser.add_argument('--threads', type=int, default=16, help="gunicorn threads per worker (local server only)")
+    parser.add_argument('--sample-interval', type=float, default=1.0, help="Seconds between worker RSS samples")
+    parser.add_argument('-o', '--output', help="Write the JSON report to this file instead of stdout")
+    return parser.parse_args()
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint in --mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def load_corpus(args):
+    if args.corpus:
+        with open(args.corpus, encoding='utf-8', errors='replace') as f:
+            urls = [line.strip() for line in f if line.strip()]
+    else:
+        urls = [url for _, url in make_corpus(args.corpus_size, args.seed)]
+    if args.save_corpus:
+        with open(args.save_corpus, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(urls) + '\n')
+    return urls
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def start_server(args):
+    """Start gunicorn with gunicorn.conf.py and wait until /readyz answers"""
+    port = free_port()
+    env = dict(os.environ,
+               GUNICORN_BIND=f'127.0.0.1:{port}',
+               GUNICORN_WORKERS=str(args.workers),
+               GUNICORN_THREADS=str(args.threads))
+    env.setdefault('LOG_LEVEL', 'WARNING')
+    here = os.path.dirname(os.path.abspath(__file__))
+    process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', os.path.join(here, 'gunicorn.conf.py')],
+                               cwd=here, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"gunicorn exited during startup:\n{process.stderr.read().decode(errors='replace')}")
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/readyz')
+            response = conn.getresponse()
+            status = response.status
+            model_loaded = json.loads(response.read()).get('model_loaded')
+            conn.close()
+            # Without a model the server answers with the heuristic and never becomes ready
+            if status == 200 or not model_loaded:
+                print(f"gunicorn ready on port {port} (readyz {status})", file=sys.stderr)
+                return process, f'http://127.0.0.1:{port}'
+        except (OSError, ValueError):
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise SystemExit("gunicorn did not become ready within 120s")
+
+def stop_server(process):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+def worker_pids(master_pid):
+    """Pids of the direct children of the gunicorn master"""
+    pids = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The command name can hold spaces, the ppid follows its closing paren
+                fields = f.read().rsplit(')', 1)[1].split()
+            if int(fields[1]) == master_pid:
+                pids.append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+    return sorted(pids)
+
+def rss_kb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+class RssSampler(threading.Thread):
+    def __init__(self, master_pid, interval):
+        super().__init__(name='rss-sampler', daemon=True)
+        self.master_pid = master_pid
+        self.interval = interval
+        self.samples = []
+        self.started = time.time()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            workers = {pid: rss_kb(pid) for pid in worker_pids(self.master_pid)}
+            workers = {pid: rss for pid, rss in workers.items() if rss is not None}
+            self.samples.append({
+                "t": round(time.time() - self.started, 2),
+                "master_rss_kb": rss_kb(self.master_pid),
+                "worker_rss_kb": workers,
+                "total_worker_rss_kb": sum(workers.values())
+            })
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+def client_process(target, urls, mix, threads, first_thread, seed, warmup, duration, timeout, results):
+    """Closed-loop clients: each thread sends its next request as soon as the previous one returns"""
+    parts = urlsplit(target)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    record_from = time.time() + warmup
+    stop_at = record_from + duration
+    per_thread = []
+
+    def run(index):
+        rng = random.Random(seed * 1000003 + index)
+        position = (index * 7919) % len(urls)
+        conn = None
+        records = []
+        while True:
+            now = time.time()
+            if now >= stop_at:
+                break
+            endpoint = rng.choices(names, weights)[0]
+            path = ENDPOINTS[endpoint](urls[position])
+            position = (position + 1) % len(urls)
+            start = time.perf_counter()
+            try:
+                if conn is None:
+                    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+                conn.request('GET', path)
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+                if response.getheader('Connection', '').lower() == 'close':
+                    conn.close()
+                    conn = None
+            except (OSError, http.client.HTTPException):
+                status = 0
+                if conn is not None:
+                    conn.close()
+                conn = None
+            latency = time.perf_counter() - start
+            if now >= record_from:
+                records.append((endpoint, status, latency))
+        if conn is not None:
+            conn.close()
+        per_thread.append(records)
+
+    workers = [threading.Thread(target=run, args=(first_thread + i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    results.put([record for records in per_thread for record in records])
+
+def summarize(records, duration):
+    latencies = np.array([latency for _, _, latency in records]) * 1000
+    statuses = {}
+    for _, status, _ in records:
+        statuses[status] = statuses.get(status, 0) + 1
+    errors = sum(count for status, count in statuses.items() if status == 0 or status >= 400)
+    summary = {
+        "requests": len(records),
+        "throughput_per_s": round(len(records) / duration, 1),
+        "error_rate": round(errors / len(records), 5) if records else 0.0,
+        "status_codes": {str(status): count for status, count in sorted(statuses.items())},
+    }
+    if len(latencies):
+        for name, q in (('p50', 50), ('p95', 95), ('p99', 99), ('p999', 99.9)):
+            summary[f"{name}_ms"] = round(float(np.percentile(latencies, q)), 3)
+        summary["max_ms"] = round(float(latencies.max()), 3)
+    return summary
+
+def run_step(args, target, urls, mix, concurrency):
+    processes = max(1, min(args.client_processes, concurrency))
+    results = multiprocessing.Queue()
+    clients = []
+    first_thread = 0
+    for i in range(processes):
+        threads = concurrency // processes + (1 if i < concurrency % processes else 0)
+        process = multiprocessing.Process(target=client_process, args=(
+            target, urls, mix, threads, first_thread, args.seed, args.warmup, args.duration, args.timeout, results))
+        first_thread += threads
+        process.start()
+        clients.append(process)
+    records = []
+    for _ in clients:
+        records.extend(results.get())
+    for process in clients:
+        process.join()
+
+    step = {"concurrency": concurrency, **summarize(records, args.duration)}
+    step["endpoints"] = {name: summarize([r for r in records if r[0] == name], args.duration)
+                         for name in mix}
+    return step
+
+def find_saturation(steps, gain=1.05):
+    """First step whose throughput is not at least `gain` times the previous step's"""
+    for previous, step in zip(steps, steps[1:]):
+        if step["throughput_per_s"] < previous["throughput_per_s"] * gain:
+            return previous["concurrency"]
+    return None
+
+def main():
+    args = parse_args()
+    mix = parse_mix(args.mix)
+    urls = load_corpus(args)
+    steps_config = [int(n) for n in args.concurrency.split(',') if n]
+
+    server = None
+    master_pid = args.server_pid
+    if args.target:
+        target = args.target.rstrip('/')
+    else:
+        server, target = start_server(args)
+        master_pid = server.pid
+
+    sampler = None
+    if master_pid and os.path.isdir('/proc'):
+        sampler = RssSampler(master_pid, args.sample_interval)
+        sampler.start()
+
+    steps = []
+    try:
+        print(f"{'conc':>5s} {'req/s':>9s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'p999':>8s} {'errors':>7s} {'rss MB':>8s}",
+              file=sys.stderr)
+        for concurrency in steps_config:
+            step = run_step(args, target, urls, mix, concurrency)
+            if sampler is not None and sampler.samples:
+                step["total_worker_rss_kb"] = sampler.samples[-1]["total_worker_rss_kb"]
+            steps.append(step)
+            print(f"{concurrency:5d} {step['throughput_per_s']:9.1f} {step.get('p50_ms', 0):8.2f} "
+                  f"{step.get('p95_ms', 0):8.2f} {step.get('p99_ms', 0):8.2f} {step.get('p999_ms', 0):8.2f} "
+                  f"{step['error_rate']:7.2%} {step.get('total_worker_rss_kb', 0) / 1024:8.1f}", file=sys.stderr)
+    finally:
+        if sampler is not None:
+            sampler.stop()
+        if server is not None:
+            stop_server(server)
+
+    best = max(steps, key=lambda s: s["throughput_per_s"]) if steps else None
+    report = {
+        "meta": {
+            "target": target if args.target else "local gunicorn",
+            "workers": None if args.target else args.workers,
+            "threads": None if args.target else args.threads,
+            "mix": mix,
+            "corpus": args.corpus or f"synthetic:{args.corpus_size}:seed={args.seed}",
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "client_processes": args.client_processes,
+        },
+        "steps": steps,
+        "max_throughput_per_s": best["throughput_per_s"] if best else None,
+        "max_throughput_concurrency": best["concurrency"] if best else None,
+        "saturation_concurrency": find_saturation(steps),
+        "rss_samples": sampler.samples if sampler is not None else [],
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
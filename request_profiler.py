@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+"""On-demand profiler for live requests to one Flask endpoint.
+
+While a session is running, the endpoint's view function is wrapped so that
+a sample of its requests is profiled. When no session runs, the original
+view is registered again and requests pay nothing. Two modes:
+
+- cprofile: each sampled request runs under cProfile (one at a time), and
+  the results are merged into one pstats table, downloadable as a pstats
+  file for snakeviz/gprof2dot or as a text summary.
+- stacks: a background thread captures the stacks of threads serving
+  sampled requests every few milliseconds, aggregated as collapsed stacks
+  for flamegraph.pl or speedscope.
+
+Sessions end on request or after their duration, whichever comes first.
+Sessions and their data are per process.
+
+    python request_profiler.py profile.pstats    # print a saved pstats file
+"""
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+MODES = ('cprofile', 'stacks')
+
+class RequestProfiler:
+    def __init__(self, app, endpoint, max_duration=3600):
+        self.app = app
+        self.endpoint = endpoint
+        self.max_duration = max_duration
+        self._lock = threading.Lock()
+        self._profile_lock = threading.Lock()
+        self._view = None
+        self._threads = {}
+        self._stop_event = None
+        self._timer = None
+        self._session = 0
+        self.mode = None
+        self.sample_rate = 0.0
+        self.interval = 0.0
+        self.started_at = None
+        self.stopped_at = None
+        self.deadline = 0.0
+        self.requests = 0
+        self.sampled = 0
+        self.skipped = 0
+        self.stack_samples = 0
+        self._stats = None
+        self._stacks = Counter()
+
+    @property
+    def active(self):
+        return self._view is not None
+
+    def start(self, mode='cprofile', sample_rate=0.1, duration=60, interval=0.005):
+        """Start a session, discarding the previous session's data"""
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}")
+        if not 0 < sample_rate <= 1:
+            raise ValueError("sample rate must be in (0, 1]")
+        if not 0 < duration <= self.max_duration:
+            raise ValueError(f"duration must be in (0, {self.max_duration}] seconds")
+        with self._lock:
+            if self.active:
+                raise RuntimeError("a profiling session is already running")
+            self.mode = mode
+            self.sample_rate = sample_rate
+            self.interval = interval
+            self.started_at = time.time()
+            self.stopped_at = None
+            self.deadline = time.monotonic() + duration
+            self.requests = self.sampled = self.skipped = self.stack_samples = 0
+            self._stats = None
+            self._stacks = Counter()
+            self._threads = {}
+            if mode == 'stacks':
+                self._stop_event = threading.Event()
+                threading.Thread(target=self._sample_stacks, args=(self._stop_event,),
+                                 name='stack-sampler', daemon=True).start()
+            self._view = self.app.view_functions[self.endpoint]
+            self.app.view_functions[self.endpoint] = self._profiled_view
+            # End the session on time even if no request arrives
+            self._session += 1
+            self._timer = threading.Timer(duration, self._expire, args=(self._session,))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def stop(self):
+        with self._lock:
+            return self._stop()
+
+    def _stop(self):
+        if not self.active:
+            return False
+        self.app.view_functions[self.endpoint] = self._view
+        self._view = None
+        self.stopped_at = time.time()
+        if self._stop_event is not None:
+            self._stop_event.set()
+            self._stop_event = None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return True
+
+    def _expire(self, session):
+        with self._lock:
+            # A timer left over from an earlier session must not stop this one
+            if session == self._session:
+                self._stop()
+
+    def _profiled_view(self, *args, **kwargs):
+        view = self._view
+        if view is None:
+            # Stopped while this request was being dispatched
+            return self.app.view_functions[self.endpoint](*args, **kwargs)
+        if time.monotonic() >= self.deadline:
+            self.stop()
+            return view(*args, **kwargs)
+        self.requests += 1
+        if random.random() >= self.sample_rate:
+            return view(*args, **kwargs)
+
+        if self.mode == 'stacks':
+            ident = threading.get_ident()
+            self._threads[ident] = sys._getframe()
+            self.sampled += 1
+            try:
+                return view(*args, **kwargs)
+            finally:
+                self._threads.pop(ident, None)
+
+        # Only one thread can run cProfile at a time, concurrent samples are skipped
+        if not self._profile_lock.acquire(blocking=False):
+            self.skipped += 1
+            return view(*args, **kwargs)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+            try:
+                return view(*args, **kwargs)
+            finally:
+                profile.disable()
+        finally:
+            self._profile_lock.release()
+            self.sampled += 1
+            with self._lock:
+                if self._stats is None:
+                    self._stats = pstats.Stats(profile)
+                else:
+                    self._stats.add(profile)
+
+    def _sample_stacks(self, stop_event):
+        while not stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            for ident, top in list(self._threads.items()):
+                frame = frames.get(ident)
+                stack = []
+                # Frames below the profiled view only
+                while frame is not None and frame is not top:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if stack:
+                    self._stacks[';'.join(reversed(stack))] += 1
+                    self.stack_samples += 1
+
+    def collapsed(self):
+        """Collapsed stacks, one 'frame;frame;frame count' line per distinct stack"""
+        stacks = dict(self._stacks)
+        return ''.join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+    def pstats_dump(self):
+        """The merged profile in the pstats file format, or None before any sample"""
+        with self._lock:
+            return marshal.dumps(self._stats.stats) if self._stats is not None else None
+
+    def text(self, sort='cumulative', limit=40, restriction=None):
+        with self._lock:
+            if self._stats is None:
+                return ''
+            out = io.StringIO()
+            self._stats.stream = out
+            self._stats.sort_stats(sort).print_stats(*([restriction] if restriction else []), limit)
+            return out.getvalue()
+
+    def status(self):
+        return {
+            "active": self.active,
+            "pid": os.getpid(),
+            "endpoint": self.endpoint,
+            "mode": self.mode,
+            "sample_rate": self.sample_rate,
+            "interval_ms": round(self.interval * 1000, 3) if self.mode == 'stacks' else None,
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at,
+            "remaining_seconds": round(max(0.0, self.deadline - time.monotonic()), 1) if self.active else 0.0,
+            "requests": self.requests,
+            "sampled": self.sampled,
+            "skipped": self.skipped,
+            "stack_samples": self.stack_samples,
+            "distinct_stacks": len(self._stacks)
+        }
+
+def main():
+    if len(sys.argv) != 2:
+        print(f"usage: {sys.argv[0]} profile.pstats", file=sys.stderr)
+        sys.exit(2)
+    pstats.Stats(sys.argv[1]).sort_stats('cumulative').print_stats(40)
+
+if __name__ == "__main__":
+    main()
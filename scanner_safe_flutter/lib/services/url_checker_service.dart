@@ -8,6 +8,10 @@ import 'dart:async';
 class UrlCheckerService {
   // Cache successfully connected URL
   static String? _cachedWorkingUrl;
+
+  // Last verdict and ETag per checked URL, revalidated with If-None-Match
+  static final Map<String, _CachedVerdict> _verdictCache = {};
+  static const int _maxCachedVerdicts = 500;
   
   // Backend URLs based on platform
   static List<String> get serverUrls {
@@ -53,25 +57,41 @@ class UrlCheckerService {
     final apiUrl = '$serverUrl/api/v1/check-url';
     
     try {
-      final payload = {'url': url};
-      print('Request payload: $payload');
-      
-      print('Sending POST request to: $apiUrl');
-      final response = await http.post(
-        Uri.parse(apiUrl),
-        headers: {
-          'Content-Type': 'application/json',
-          'Accept': 'application/json',
-        },
-        body: jsonEncode(payload),
+      // GET lets the server, proxies and CDNs answer repeats from cache
+      final cached = _verdictCache[url];
+      final headers = {'Accept': 'application/json'};
+      if (cached != null) {
+        headers['If-None-Match'] = cached.etag;
+      }
+
+      print('Sending GET request to: $apiUrl');
+      final response = await http.get(
+        Uri.parse(apiUrl).replace(queryParameters: {'url': url}),
+        headers: headers,
       ).timeout(const Duration(seconds: 15));
       
       print('Response status code: ${response.statusCode}');
       print('Response headers: ${response.headers}');
       print('Response body: ${response.body}');
       
-      if (response.statusCode == 200) {
+      if (response.statusCode == 304 && cached != null) {
+        final data = cached.data;
+        return UrlSafetyResult(
+          url: url,
+          isSafe: data['is_safe'] ?? false,
+          confidence: data['confidence'] ?? 0.0,
+          details: data['details'] ?? '',
+          timestamp: DateTime.now(),
+        );
+      } else if (response.statusCode == 200) {
         final data = jsonDecode(response.body);
+        final etag = response.headers['etag'];
+        if (etag != null) {
+          if (_verdictCache.length >= _maxCachedVerdicts) {
+            _verdictCache.remove(_verdictCache.keys.first);
+          }
+          _verdictCache[url] = _CachedVerdict(etag, data);
+        }
         return UrlSafetyResult(
           url: url,
           isSafe: data['is_safe'] ?? false,
@@ -352,4 +372,11 @@ extension UrlCheckerServiceTestExtension on UrlCheckerService {
     
     return results;
   }
-} 
\ No newline at end of file
+} 
+
+class _CachedVerdict {
+  final String etag;
+  final Map<String, dynamic> data;
+
+  _CachedVerdict(this.etag, this.data);
+}
@@ -0,0 +1,62 @@
+import os
+import random
+import sys
+
+import joblib
+import numpy as np
+import pytest
+
+# Keep the app's request logging out of test output
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+
+HOSTS = ['google.com', 'paypal-login.secure-verify.xyz', '192.168.1.4', 'bank.example.com',
+         'github.com', 'free-prize.win', 'WWW.Example.COM', 'docs.python.org']
+PATHS = ['', 'login', 'account/verify', 'free/prize', 'index.html', '%7Euser', 'a/b/c/d']
+
+def make_urls(count, seed=0):
+    rng = random.Random(seed)
+    urls = []
+    for i in range(count):
+        url = f"{rng.choice(['http', 'https'])}://{rng.choice(HOSTS)}/{rng.choice(PATHS)}"
+        if i % 3 == 0:
+            url += f"?id={rng.randint(0, 10 ** 6)}&ref=mail"
+        urls.append(url)
+    return urls
+
+@pytest.fixture(scope='session')
+def app():
+    return app_module
+
+@pytest.fixture(scope='session')
+def model_files(tmp_path_factory):
+    """A small scaler and random forest fitted on synthetic URLs, saved with joblib"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+    urls = make_urls(600)
+    X = app_module.extract_features_batch(urls)
+    y = np.array([int(any(word in url for word in ('login', 'free', '192.'))) for url in urls])
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0).fit(scaler.transform(X), y)
+    directory = tmp_path_factory.mktemp('model')
+    model_path, scaler_path = str(directory / 'model.joblib'), str(directory / 'scaler.joblib')
+    joblib.dump(model, model_path)
+    joblib.dump(scaler, scaler_path)
+    return model_path, scaler_path
+
+@pytest.fixture
+def bundle(model_files, monkeypatch):
+    """Activate the test model with an empty verdict cache for one test"""
+    bundle = app_module.build_model_bundle(*model_files)
+    monkeypatch.setattr(app_module.registry, 'active', bundle)
+    monkeypatch.setattr(app_module, 'verdict_cache', app_module.VerdictCache(1000, 60))
+    app_module.verdict_cache.set_version(bundle.verdict_version)
+    return bundle
+
+def cascade_bundle(bundle, safe_threshold, malicious_threshold=1.0):
+    """The bundle's model behind a cascade that answers safe for every URL below safe_threshold"""
+    from cascade import CHEAP_FEATURES, Cascade
+    cascade = Cascade([0.0] * len(CHEAP_FEATURES), -10.0, safe_threshold, malicious_threshold, bundle.version)
+    return app_module.ModelBundle(bundle.model, bundle.scaler, bundle.engine, bundle.version, cascade)
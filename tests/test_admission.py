@@ -0,0 +1,60 @@
+import threading
+
+from conftest import make_urls
+
+def check_concurrently(client, urls, clients):
+    results = []
+    lock = threading.Lock()
+
+    def run(part):
+        for url in part:
+            response = client.get('/api/v1/check-url', query_string={'url': url})
+            with lock:
+                results.append(response.get_json())
+
+    threads = [threading.Thread(target=run, args=(urls[i::clients],)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_default_slots_scale_with_batching_and_pool(app):
+    assert app.admission_slots(0, 0) == 4
+    assert app.admission_slots(8, 0) == 16
+    assert app.admission_slots(0, 64) == 128
+
+def test_micro_batches_are_not_capped_by_admission(app, bundle, monkeypatch):
+    batcher = app.MicroBatcher(app.predict_urls_safety, 64, 0.02)
+    admission = app.AdmissionController(0, 1, app.admission_slots(0, 64), 32, 0.5, 5)
+    monkeypatch.setattr(app, 'micro_batcher', batcher)
+    monkeypatch.setattr(app, 'admission', admission)
+    urls = list(dict.fromkeys(f"{url}&n={i}" if '?' in url else f"{url}?n={i}"
+                              for i, url in enumerate(make_urls(256))))
+
+    results = check_concurrently(app.app.test_client(), urls, 64)
+
+    assert len(results) == len(urls)
+    assert not [r for r in results if r.get('degraded')]
+    assert batcher.stats()['largest_batch'] > 4
+    assert admission.stats()['shed'] == dict.fromkeys(app.AdmissionController.SHED_REASONS, 0)
+
+def test_overloaded_checks_are_answered_degraded(app, bundle, monkeypatch):
+    admission = app.AdmissionController(0, 1, 1, 0, 0.01, 5)
+    monkeypatch.setattr(app, 'admission', admission)
+    assert admission.acquire()
+    try:
+        response = app.app.test_client().get('/api/v1/check-url', query_string={'url': 'http://192.168.1.4/login'})
+    finally:
+        admission.release()
+    assert response.get_json()['degraded'] is True
+    assert response.headers['Cache-Control'] == 'no-store'
+    assert admission.stats()['shed']['queue_full'] == 1
+
+def test_disabled_slots_leave_in_flight_at_zero(app, bundle, monkeypatch):
+    admission = app.AdmissionController(0, 1, 0, 32, 0.5, 5)
+    monkeypatch.setattr(app, 'admission', admission)
+    results = check_concurrently(app.app.test_client(), make_urls(20, seed=7), 4)
+    assert not [r for r in results if r.get('degraded')]
+    assert admission.stats()['in_flight'] == 0
+    assert 'admission_in_flight 0' in app.app.test_client().get('/metrics').get_data(as_text=True)
@@ -0,0 +1,36 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import bulk_scan
+
+@pytest.mark.parametrize('line', ['[1]', '"https://example.com"', '42', 'null', '{"url": 5}', '{"url": ["a"]}', '{bad'])
+def test_non_object_jsonl_lines_are_invalid(line):
+    with pytest.raises(ValueError):
+        bulk_scan.parse_line(line, 'jsonl', 'url')
+
+def test_parse_line():
+    assert bulk_scan.parse_line('  \n', 'auto', 'url') is None
+    assert bulk_scan.parse_line('{"link": "a.com"}', 'jsonl', 'link') == 'a.com'
+    assert bulk_scan.parse_line('{"other": 1}', 'jsonl', 'url') is None
+    assert bulk_scan.parse_line('{"url": "a.com"}\n', 'auto', 'url') == 'a.com'
+    assert bulk_scan.parse_line('[1]', 'auto', 'url') == '[1]'
+
+def test_invalid_lines_become_error_records(bundle):
+    lines = ['{"url": "https://example.com/login"}\n', '[1]\n', '\n', '{"url": "github.com"}\n']
+    records = [json.loads(line) for line in bulk_scan.score_chunk((10, lines, 'jsonl', 'url')).splitlines()]
+    assert [record["line"] for record in records] == [10, 11, 13]
+    assert "error" in records[1] and "JSON object" in records[1]["error"]
+    assert all("is_safe" in record for record in (records[0], records[2]))
+
+def test_bulk_scan_never_opens_the_verdict_store(tmp_path):
+    path = tmp_path / 'verdicts.db'
+    env = dict(os.environ, VERDICT_STORE_PATH=str(path))
+    code = "import bulk_scan; print(bulk_scan.app.verdict_store)"
+    result = subprocess.run([sys.executable, '-c', code], env=env, cwd=os.path.dirname(bulk_scan.__file__),
+                            capture_output=True, text=True, timeout=120)
+    assert result.stdout.strip() == 'None', result.stderr
+    assert not path.exists()
@@ -0,0 +1,59 @@
+import random
+
+import numpy as np
+import pytest
+
+from domain_index import DomainIndex, build_table, domain_hash
+
+DOMAINS = ['example.com', '*.evil.co.uk', 'Bank.Example.ORG.', '# comment', '', 'login.test.net  # phishing']
+
+@pytest.fixture(params=['memory', 'mapped'])
+def index(request, tmp_path):
+    if request.param == 'memory':
+        return DomainIndex.from_domains(DOMAINS)
+    path = tmp_path / 'list.txt'
+    path.write_text('\n'.join(DOMAINS) + '\n')
+    index = DomainIndex.from_file(str(path))
+    assert (tmp_path / 'list.txt.npy').exists()
+    return index
+
+def test_exact_match(index):
+    assert index.match('example.com') == 'example.com'
+    assert index.match('EXAMPLE.COM.') == 'example.com'
+    assert index.match('bank.example.org') == 'bank.example.org'
+    assert len(index) == 4
+
+def test_subdomain_match(index):
+    assert index.match('a.b.example.com') == 'example.com'
+    assert index.match('www.evil.co.uk') == 'evil.co.uk'
+    assert index.match('x.login.test.net') == 'login.test.net'
+    assert 'deep.bank.example.org' in index
+
+def test_near_miss_prefix_does_not_match(index):
+    assert index.match('xexample.com') is None
+    assert index.match('example.com.evil.net') is None
+    assert index.match('notevil.co.uk') is None
+    assert index.match('example.org') is None
+    assert index.match('test.net') is None
+
+def test_public_suffix_only_host_does_not_match(index):
+    for host in ('com', 'co.uk', 'uk', 'org', '.', ''):
+        assert index.match(host) is None
+
+def test_many_domains_with_probe_chains():
+    rng = random.Random(0)
+    domains = {f"{''.join(rng.choices('abcdefghij', k=8))}.com" for _ in range(5000)}
+    index = DomainIndex.from_domains(domains)
+    assert len(index) == len(domains)
+    assert all(index.match(f"www.{domain}") == domain for domain in domains)
+    assert not any(f"q{domain}" in index for domain in list(domains)[:500])
+
+def test_table_places_every_hash_once():
+    hashes = [domain_hash(f"d{i}.com") for i in range(1000)]
+    table = build_table(hashes + hashes[:10])
+    assert len(table) & (len(table) - 1) == 0 and len(table) >= 2 * 1000
+    assert sorted(table[table != 0].tolist()) == sorted(hashes)
+
+def test_empty_index_matches_nothing():
+    assert DomainIndex().match('example.com') is None
+    assert np.count_nonzero(DomainIndex.from_domains([]).table) == 0
@@ -0,0 +1,95 @@
+import re
+from urllib.parse import urlparse
+
+import numpy as np
+import pytest
+
+from conftest import make_urls
+from url_corpus import make_corpus
+
+def reference_features(url):
+    """extract_features as first shipped, frozen to check the fast path against"""
+    parsed_url = urlparse(url)
+    hostname = parsed_url.hostname if parsed_url.hostname else ''
+    path = parsed_url.path if parsed_url.path else ''
+
+    features = {
+        'length_url': len(url),
+        'length_hostname': len(hostname),
+        'ip': int(bool(re.match(r'\d+\.\d+\.\d+\.\d+', hostname))),
+        'nb_dots': url.count('.'),
+        'nb_hyphens': url.count('-'),
+        'nb_at': url.count('@'),
+        'nb_qm': url.count('?'),
+        'nb_and': url.count('&'),
+        'nb_or': url.count('|'),
+        'nb_eq': url.count('='),
+        'nb_underscore': url.count('_'),
+        'nb_tilde': url.count('~'),
+        'nb_percent': url.count('%'),
+        'nb_slash': url.count('/'),
+        'nb_star': url.count('*'),
+        'nb_colon': url.count(':'),
+        'nb_comma': url.count(','),
+        'nb_semicolon': url.count(';'),
+        'nb_dollar': url.count('$'),
+        'nb_space': url.count(' '),
+        'nb_www': url.count('www'),
+        'nb_com': url.count('.com'),
+        'nb_dslash': url.count('//'),
+        'http_in_path': int('http' in path.lower()),
+        'https_token': int('https' in path.lower()),
+        'ratio_digits_url': sum(c.isdigit() for c in url) / len(url),
+        'ratio_digits_host': sum(c.isdigit() for c in hostname) / len(hostname) if hostname else 0,
+        'nb_redirection': url.count('//'),
+        'length_words_raw': len(re.findall(r'\w+', url)),
+        'char_repeat': max([len(m.group(0)) for m in re.finditer(r'(.)\1*', url)], default=0),
+        'shortest_word_length': min([len(word) for word in re.findall(r'\w+', url)], default=0),
+        'longest_word_length': max([len(word) for word in re.findall(r'\w+', url)], default=0),
+        'avg_word_length': np.mean([len(word) for word in re.findall(r'\w+', url)]) if re.findall(r'\w+', url) else 0
+    }
+
+    feature_order = [
+        'length_url', 'length_hostname', 'ip', 'nb_dots', 'nb_hyphens', 'nb_at', 'nb_qm', 'nb_and', 'nb_or', 'nb_eq',
+        'nb_underscore', 'nb_tilde', 'nb_percent', 'nb_slash', 'nb_star', 'nb_colon', 'nb_comma', 'nb_semicolon', 'nb_dollar',
+        'nb_space', 'nb_www', 'nb_com', 'nb_dslash', 'http_in_path', 'https_token', 'ratio_digits_url', 'ratio_digits_host',
+        'nb_redirection', 'length_words_raw', 'char_repeat', 'shortest_word_length', 'longest_word_length', 'avg_word_length'
+    ]
+
+    return [features[feature] for feature in feature_order]
+
+EDGE_CASES = [
+    # Unicode digits and word characters
+    'https://١٢٣.example.com/٤٥٦', 'https://例え.jp/パス/²³', 'https://xn--r8jz45g.jp/ünïcödé_١', 'https://host/①②③',
+    # Newlines, tabs and spaces
+    'https://example.com/a\nb', 'https://exa\nmple.com/', 'https://example.com/\r\n\t x', '\n',
+    # IPv6 and IPv4 hosts
+    'http://[::1]/', 'http://[2001:db8::1]:8080/login?x=1', 'http://[::ffff:192.168.0.1]/a', 'http://192.168.0.1.evil.com/',
+    'http://1.2.3.4:80/', 'http://999.999.999.999/', 'http://[::1]x/',
+    # Empty hosts and paths
+    'https://', 'https:///path', 'file:///etc/passwd', 'https://@/', 'https://:80/', 'https://?q=1', '//', 'a', 'aaaa',
+    # Mixed case, percent-encoding, repeats
+    'HTTPS://WWW.EXAMPLE.COM/HTTP/Login', 'https://example.com/http://evil.com//x', 'https://a.com/%7E%7e~~~___---',
+]
+
+BAD_INPUTS = ['', 'http://[::1/', 'http://[not-ipv6]/', 'https://[']
+
+@pytest.mark.parametrize('url', EDGE_CASES)
+def test_edge_cases_match_reference(app, url):
+    assert app.extract_features(url) == pytest.approx(reference_features(url), rel=1e-12, abs=0)
+
+def test_corpus_matches_reference(app):
+    urls = make_urls(300, seed=2) + [url for _, url in make_corpus(500, seed=3)]
+    expected = np.array([reference_features(url) for url in urls], dtype=float)
+    np.testing.assert_allclose(app.extract_features_batch(urls), expected, rtol=1e-12)
+    for url, row in zip(urls, expected):
+        np.testing.assert_allclose(app.extract_features_into(url, np.empty(app.N_FEATURES)), row, rtol=1e-12)
+
+@pytest.mark.parametrize('url', BAD_INPUTS)
+def test_same_inputs_raise(app, url):
+    with pytest.raises(Exception) as expected:
+        reference_features(url)
+    with pytest.raises(type(expected.value)):
+        app.extract_features(url)
+    with pytest.raises(type(expected.value)):
+        app.extract_features_into(url, np.empty(app.N_FEATURES))
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import GaussianNB
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+from app import NumpyInference, extract_features_batch
+from conftest import make_urls
+from url_corpus import make_corpus
+
+SCALERS = [StandardScaler, MinMaxScaler]
+ESTIMATORS = [
+    lambda: LogisticRegression(max_iter=2000),
+    lambda: RandomForestClassifier(n_estimators=15, max_depth=8, random_state=0),
+    lambda: DecisionTreeClassifier(random_state=0),
+    lambda: ExtraTreesClassifier(n_estimators=10, random_state=0),
+]
+
+@pytest.fixture(scope='module')
+def data():
+    urls = make_urls(400, seed=4) + [url for _, url in make_corpus(600, seed=5)]
+    X = extract_features_batch(urls)
+    y = np.array([int(any(word in url for word in ('login', 'verify', 'free', 'paypal'))) for url in urls])
+    # Held-out rows, including values outside the training range
+    X_test = np.vstack([extract_features_batch(make_urls(200, seed=6)), X[:50] * 3.0])
+    return X, y, X_test
+
+def fit(scaler_type, make_estimator, X, y):
+    scaler = scaler_type().fit(X)
+    return scaler, make_estimator().fit(scaler.transform(X), y)
+
+@pytest.mark.parametrize('scaler_type', SCALERS)
+@pytest.mark.parametrize('make_estimator', ESTIMATORS)
+def test_matches_sklearn(data, scaler_type, make_estimator):
+    X, y, X_test = data
+    scaler, estimator = fit(scaler_type, make_estimator, X, y)
+    engine = NumpyInference(scaler, estimator)
+    expected = estimator.predict_proba(scaler.transform(X_test))
+    np.testing.assert_allclose(engine.predict_proba(X_test), expected, rtol=1e-9, atol=1e-12)
+    np.testing.assert_array_equal(engine.classes, estimator.classes_)
+
+@pytest.mark.parametrize('make_estimator', ESTIMATORS)
+def test_map_arrays_round_trip(data, make_estimator, tmp_path):
+    X, y, X_test = data
+    scaler, estimator = fit(StandardScaler, make_estimator, X, y)
+    engine = NumpyInference(scaler, estimator)
+    before = engine.predict_proba(X_test)
+    engine.export_arrays(str(tmp_path))
+
+    mapped = NumpyInference(scaler, estimator)
+    mapped.map_arrays(str(tmp_path))
+    arrays = {name: value for name, value in vars(mapped).items() if isinstance(value, np.ndarray)}
+    assert arrays and all(isinstance(value, np.memmap) and not value.flags.writeable for value in arrays.values())
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(f"{name}.npy" for name in arrays)
+    np.testing.assert_array_equal(mapped.predict_proba(X_test), before)
+
+def test_unsupported_models_are_rejected(data):
+    X, y, _ = data
+    with pytest.raises(TypeError):
+        NumpyInference(*fit(StandardScaler, GaussianNB, X, y))
+    scaler = MinMaxScaler(clip=True).fit(X)
+    with pytest.raises(TypeError):
+        NumpyInference(scaler, LogisticRegression(max_iter=2000).fit(scaler.transform(X), y))
+
+def test_rejects_wrong_feature_count(data):
+    X, y, _ = data
+    engine = NumpyInference(*fit(StandardScaler, ESTIMATORS[0], X, y))
+    with pytest.raises(ValueError):
+        engine.predict_proba(X[:, :-1])
@@ -0,0 +1,31 @@
+import pytest
+
+from conftest import make_urls
+from inference_pool import InferencePool, pack_urls, unpack_urls
+
+def test_packed_urls_round_trip():
+    urls = make_urls(50) + ['', 'https://例え.jp/パス', 'https://x.com/\ud800']
+    assert unpack_urls(*pack_urls(urls)) == urls
+
+@pytest.fixture
+def pool():
+    pool = InferencePool(1, 64)
+    yield pool
+    pool.shutdown()
+
+def test_workers_refuse_a_model_version_they_cannot_load(bundle, pool):
+    # Pool workers load the artifacts from MODEL_PATH, never the test model
+    with pytest.raises(RuntimeError, match=bundle.version):
+        pool.predict_proba(make_urls(10), bundle.version)
+    assert pool.stats()["failures"] == 1
+
+def test_batch_falls_back_to_in_process_scoring(app, bundle, pool, monkeypatch):
+    urls = make_urls(200, seed=1)
+    expected = app.predict_urls_safety(urls)
+
+    monkeypatch.setattr(app, 'verdict_cache', app.VerdictCache(1000, 60))
+    app.verdict_cache.set_version(bundle.verdict_version)
+    monkeypatch.setattr(app, 'inference_pool', pool)
+    assert app.predict_urls_safety(urls) == expected
+    assert pool.stats()["failures"] == 1
+    assert all(result["model_version"] == bundle.version for result in expected)
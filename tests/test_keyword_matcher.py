@@ -0,0 +1,36 @@
+import random
+
+import pytest
+
+from keyword_matcher import KeywordMatcher
+
+def naive_find(words, text):
+    return {w.strip().lower() for w in words if w.strip() and w.strip().lower() in text.lower()}
+
+@pytest.mark.parametrize('seed', range(20))
+def test_matches_naive_substring_search(seed):
+    rng = random.Random(seed)
+    # A small alphabet makes overlapping words, shared prefixes and failure links common
+    alphabet = 'abcab.-/' if seed % 2 else 'abcdefghijklmnopqrstuvwxyz0123456789.-/%'
+    words = [''.join(rng.choices(alphabet, k=rng.randint(1, 6))) for _ in range(rng.randint(1, 40))]
+    words += [w.upper() for w in rng.sample(words, len(words) // 4)] + ['', '  ']
+    matcher = KeywordMatcher(words)
+    for _ in range(200):
+        text = ''.join(rng.choices(alphabet + 'ABC', k=rng.randint(0, 80)))
+        found = matcher.find(text)
+        assert len(found) == len(set(found))
+        assert set(found) == naive_find(words, text)
+
+def test_overlapping_and_nested_words():
+    matcher = KeywordMatcher(['he', 'she', 'his', 'hers', 'login', 'log'])
+    assert set(matcher.find('USHERS')) == {'she', 'he', 'hers'}
+    assert matcher.find('https://x.com/LOGIN') == ['log', 'login']
+    assert matcher.find('') == [] and KeywordMatcher([]).find('anything') == []
+    assert len(matcher) == 6
+
+def test_from_file_skips_comments(tmp_path):
+    path = tmp_path / 'words.txt'
+    path.write_text("# suspicious words\nFree\n\nprize  # inline comment\n")
+    matcher = KeywordMatcher.from_file(str(path))
+    assert matcher.words == ['free', 'prize']
+    assert matcher.find('https://free-prize.example') == ['free', 'prize']
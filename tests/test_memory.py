@@ -0,0 +1,22 @@
+import os
+
+import pytest
+
+pytestmark = pytest.mark.skipif(not os.path.exists('/proc/self/smaps_rollup'), reason="needs Linux /proc")
+
+def test_health_and_metrics_skip_pss(app, monkeypatch):
+    real_open = open
+    opened = []
+    def tracking_open(path, *args, **kwargs):
+        opened.append(str(path))
+        return real_open(path, *args, **kwargs)
+    monkeypatch.setattr('builtins.open', tracking_open)
+    client = app.app.test_client()
+    health = client.get('/api/health').get_json()
+    assert client.get('/metrics').status_code == 200
+    assert health["memory"]["vmrss_kb"] > 0 and "pss_kb" not in health["memory"]
+    assert '/proc/self/smaps_rollup' not in opened
+
+def test_diagnostics_reports_pss(app):
+    memory = app.app.test_client().get('/api/diagnostics').get_json()["memory"]
+    assert 0 < memory["pss_kb"] and memory["vmrss_kb"] > 0
@@ -0,0 +1,39 @@
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from request_profiler import RequestProfiler
+
+@pytest.fixture
+def profiled():
+    app = Flask(__name__)
+
+    @app.route('/work')
+    def work():
+        return 'ok'
+
+    return app, RequestProfiler(app, 'work')
+
+@pytest.mark.parametrize('mode', ['cprofile', 'stacks'])
+def test_session_ends_at_deadline_without_traffic(profiled, mode):
+    app, profiler = profiled
+    view = app.view_functions['work']
+    profiler.start(mode=mode, duration=0.2, interval=0.01)
+    assert profiler.status()["active"]
+    time.sleep(0.5)
+    status = profiler.status()
+    assert not status["active"] and status["stopped_at"] is not None
+    assert app.view_functions['work'] is view
+    assert not any(thread.name == 'stack-sampler' for thread in threading.enumerate())
+
+def test_stale_timer_does_not_stop_next_session(profiled):
+    app, profiler = profiled
+    profiler.start(duration=0.2)
+    assert profiler.stop()
+    profiler.start(duration=60)
+    time.sleep(0.4)
+    assert profiler.active
+    assert app.test_client().get('/work').data == b'ok'
+    assert profiler.stop() and not profiler.stop()
@@ -0,0 +1,35 @@
+import json
+
+from conftest import make_urls
+
+def scan(app, lines):
+    body = ''.join(line + '\n' for line in lines).encode()
+    response = app.app.test_client().post('/api/v1/scan-stream', data=body,
+                                          content_type='application/x-ndjson')
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+def test_deeply_nested_line_becomes_an_error_row(app, bundle):
+    records = scan(app, ['https://example.com', '{"a":' * 3000, '{"url": "github.com/login"}'])
+    assert [record["line"] for record in records] == [0, 1, 2]
+    assert "error" in records[1]
+    assert "is_safe" in records[0] and "is_safe" in records[2]
+
+def test_each_batch_takes_one_admission_slot(app, bundle, monkeypatch):
+    admission = app.AdmissionController(0, 1, 4, 32, 0.5, 5)
+    monkeypatch.setattr(app, 'admission', admission)
+    monkeypatch.setattr(app, 'STREAM_BATCH_SIZE', 10)
+    records = scan(app, make_urls(35, seed=8))
+    assert len(records) == 35 and not [r for r in records if r.get('degraded')]
+    assert admission.stats()["admitted"] == 4
+    assert admission.in_flight == 0
+
+def test_stream_is_degraded_when_slots_are_taken(app, bundle, monkeypatch):
+    admission = app.AdmissionController(0, 1, 1, 0, 0.01, 5)
+    monkeypatch.setattr(app, 'admission', admission)
+    assert admission.acquire()
+    try:
+        records = scan(app, make_urls(5, seed=9))
+    finally:
+        admission.release()
+    assert len(records) == 5 and all(record["degraded"] for record in records)
@@ -0,0 +1,63 @@
+import pytest
+
+from conftest import cascade_bundle
+
+SPELLINGS = ['https://WWW.Example.COM/login/', 'https://www.example.com/login', 'www.example.com/login/']
+
+def verdicts(app, urls, batch):
+    if batch:
+        return app.predict_urls_safety(urls)
+    return [app.predict_url_safety(url) for url in urls]
+
+@pytest.mark.parametrize('batch', [False, True])
+@pytest.mark.parametrize('order', [SPELLINGS, SPELLINGS[::-1]])
+def test_spellings_sharing_a_cache_key_get_one_verdict(app, bundle, order, batch):
+    results = verdicts(app, order, batch)
+    # Each answer still reports the URL as it was asked
+    assert [result["url"] for result in results] == [url if url.startswith('https://') else 'https://' + url
+                                                     for url in order]
+    assert len({(result["is_safe"], result["confidence"]) for result in results}) == 1
+
+@pytest.mark.parametrize('batch', [False, True])
+def test_cached_verdict_matches_a_fresh_score(app, bundle, monkeypatch, batch):
+    first, = verdicts(app, [SPELLINGS[0]], batch)
+    monkeypatch.setattr(app, 'verdict_cache', app.VerdictCache(1000, 60))
+    app.verdict_cache.set_version(bundle.verdict_version)
+    fresh, = verdicts(app, [SPELLINGS[1]], batch)
+    assert (first["is_safe"], first["confidence"]) == (fresh["is_safe"], fresh["confidence"])
+
+def test_verdict_version_covers_the_cascade(bundle):
+    assert bundle.verdict_version == f"{bundle.version}:nocascade"
+    versions = {cascade_bundle(bundle, 0.01).verdict_version, cascade_bundle(bundle, 0.02).verdict_version,
+                cascade_bundle(bundle, 0.01, 0.9).verdict_version, bundle.verdict_version}
+    assert len(versions) == 4
+    assert cascade_bundle(bundle, 0.01).verdict_version == cascade_bundle(bundle, 0.01).verdict_version
+
+def test_retuned_cascade_drops_cached_verdicts_and_etags(app, bundle, monkeypatch):
+    monkeypatch.setattr(app, 'CHECK_URL_MAX_AGE', 60)
+    client = app.app.test_client()
+    url = 'https://example.com/account'
+    app.registry._activate(cascade_bundle(bundle, 0.01), 'test')
+    first = client.get('/api/v1/check-url', query_string={'url': url})
+    assert first.get_json()["tier"] == "cascade"
+    assert client.get('/api/v1/check-url', query_string={'url': url},
+                      headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+    # Same model, cascade retuned so it never answers
+    app.registry._activate(cascade_bundle(bundle, 0.0), 'test')
+    assert app.verdict_cache.stats()["size"] == 0
+    second = client.get('/api/v1/check-url', query_string={'url': url}, headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert "tier" not in second.get_json()
+    assert second.headers['ETag'] != first.headers['ETag']
+
+def test_test_endpoint_scores_like_check_url(app, bundle):
+    client = app.app.test_client()
+    probabilities = []
+    for url in SPELLINGS:
+        result = client.get('/api/test', query_string={'url': url}).get_json()
+        assert result["scored_url"] == app.normalize_url(url)
+        probabilities.append(result["probabilities"])
+    assert probabilities[0] == probabilities[1] == probabilities[2]
+    verdict = client.get('/api/v1/check-url', query_string={'url': SPELLINGS[0]}).get_json()
+    assert verdict["confidence"] == pytest.approx(max(probabilities[0]))
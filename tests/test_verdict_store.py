@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from conftest import cascade_bundle
+from verdict_store import VerdictStore
+
+@pytest.fixture
+def store(tmp_path):
+    return VerdictStore(str(tmp_path / 'verdicts.db'), ttl=60, max_rows=100)
+
+def test_round_trip_per_version(store):
+    store.put('https://a.com', 'v1', {"is_safe": True, "confidence": 0.9})
+    store.flush()
+    assert store.get('https://a.com', 'v1') == {"is_safe": True, "confidence": 0.9}
+    assert store.get('https://a.com', 'v2') is None
+    assert store.get('https://b.com', 'v1') is None
+    assert store.stats()["hits"] == 1 and store.stats()["misses"] == 2
+
+def test_expired_verdicts_are_not_served(store):
+    store.ttl = 0.05
+    store.put('https://a.com', 'v1', {"is_safe": True})
+    store.flush()
+    time.sleep(0.1)
+    assert store.get('https://a.com', 'v1') is None
+
+def test_prune_keeps_most_requested(store):
+    store.max_rows = 2
+    for url in ('https://a.com', 'https://b.com', 'https://c.com'):
+        store.put(url, 'v1', {"url": url})
+    store.put('https://c.com', 'v1', {"url": 'https://c.com'})
+    store.put('https://a.com', 'v1', {"url": 'https://a.com'})
+    store.flush()
+    store.prune()
+    assert [url for url, _ in store.hot('v1', 10)] == ['https://a.com', 'https://c.com']
+
+def test_stored_verdict_not_served_after_cascade_changes(app, bundle, store, monkeypatch):
+    monkeypatch.setattr(app, 'verdict_store', store)
+    url = 'https://example.com/account'
+    app.registry._activate(cascade_bundle(bundle, 0.01), 'test')
+    assert app.predict_url_safety(url)["tier"] == "cascade"
+    store.flush()
+
+    # A restart with the same inputs reads the stored verdict
+    app.verdict_cache.clear()
+    assert app.predict_url_safety(url)["tier"] == "cascade"
+    assert store.stats()["hits"] == 1
+
+    # Retuned cascade for the same model: the stored verdict is ignored
+    app.registry._activate(cascade_bundle(bundle, 0.0), 'test')
+    app.verdict_cache.clear()
+    assert "tier" not in app.predict_url_safety(url)
+    assert store.stats()["hits"] == 1
+
+def test_stored_verdict_not_served_after_lists_change(app, bundle, store, monkeypatch):
+    monkeypatch.setattr(app, 'verdict_store', store)
+    url = 'https://example.com/login'
+    app.predict_url_safety(url)
+    store.flush()
+    app.verdict_cache.clear()
+    monkeypatch.setattr(app, 'VERDICT_INPUTS_VERSION', 'edited-lists')
+    app.predict_url_safety(url)
+    assert store.stats()["hits"] == 0
@@ -0,0 +1,34 @@
+"""Seeded synthetic URL corpus shared by the benchmarks and the load test.
+
+Importing this module has no side effects: it neither imports the app nor
+touches the environment, so a load generator can use it without loading the
+model or changing the settings of the server it starts.
+"""
+import random
+import string
+
+WORDS = ['login', 'secure', 'account', 'verify', 'update', 'paypal', 'bank', 'home', 'index',
+         'docs', 'static', 'img', 'assets', 'api', 'v1', 'user', 'profile', 'search', 'free']
+TLDS = ['com', 'org', 'net', 'io', 'xyz', 'co.uk', 'ru', 'tk']
+
+def _word(rng):
+    return rng.choice(WORDS) if rng.random() < 0.7 else ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10)))
+
+def _host(rng, labels=2):
+    return '.'.join(_word(rng) for _ in range(labels - 1)) + '.' + rng.choice(TLDS)
+
+def make_corpus(size, seed=0):
+    """Synthetic URLs in five equally sized categories"""
+    rng = random.Random(seed)
+    generators = {
+        'short': lambda: f"https://{_host(rng)}",
+        'long': lambda: f"https://{_host(rng, rng.randint(3, 6))}/" + '/'.join(_word(rng) for _ in range(rng.randint(10, 30))) + '.html',
+        'ip_host': lambda: f"http://{rng.randint(1, 255)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}/{_word(rng)}/{_word(rng)}.php",
+        'encoded': lambda: f"https://{_host(rng)}/" + ''.join(f"%{rng.randint(0, 255):02X}" if rng.random() < 0.6 else rng.choice(string.ascii_letters) for _ in range(rng.randint(20, 80))),
+        'query_heavy': lambda: f"https://{_host(rng, 3)}/{_word(rng)}?" + '&'.join(f"{_word(rng)}={rng.randint(0, 10 ** 6)}" for _ in range(rng.randint(5, 25))),
+    }
+    corpus = []
+    for i in range(size):
+        category = list(generators)[i % len(generators)]
+        corpus.append((category, generators[category]()))
+    return corpus
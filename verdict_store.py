@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+"""Persistent verdict store shared by all worker processes.
+
+Verdicts are kept in a SQLite database in WAL mode, keyed by normalized URL
+and model version, so every gunicorn worker on the box reads what any other
+worker computed and the verdicts survive restarts and deploys. Readers never
+block each other or the writer under WAL.
+
+Reads are one indexed SELECT on the request path. Writes are buffered in
+memory and flushed in a single transaction by a background thread, so a
+request never waits for a disk write. Every write and store hit bumps a hit
+counter, and at startup the most requested verdicts for the active model are
+loaded into the in-memory cache before the first request.
+
+    python verdict_store.py stats verdicts.db
+    python verdict_store.py prune verdicts.db --ttl 604800
+"""
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS verdicts (
+        url TEXT NOT NULL,
+        model_version TEXT NOT NULL,
+        verdict TEXT NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 1,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (url, model_version)
+    )""",
+    "CREATE INDEX IF NOT EXISTS verdicts_hot ON verdicts (model_version, hits DESC)",
+    "CREATE INDEX IF NOT EXISTS verdicts_age ON verdicts (updated_at)",
+)
+
+UPSERT = """INSERT INTO verdicts (url, model_version, verdict, hits, updated_at) VALUES (?, ?, ?, 1, ?)
+    ON CONFLICT (url, model_version) DO UPDATE
+    SET verdict = excluded.verdict, updated_at = excluded.updated_at, hits = hits + 1"""
+TOUCH = "UPDATE verdicts SET hits = hits + 1 WHERE url = ? AND model_version = ?"
+
+def connect(path, timeout=5.0):
+    conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    # Durable up to the last checkpoint, a lost verdict is only recomputed
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
+class VerdictStore:
+    def __init__(self, path, ttl, max_rows, flush_interval=0.5, max_pending=10000, prune_interval=300):
+        self.path = path
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.prune_interval = prune_interval
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pending = []
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.dropped = 0
+        self.errors = 0
+
+        # Create the schema up front so a bad path fails at startup, then
+        # close the connection: SQLite connections must not cross a fork
+        conn = connect(path)
+        with conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+        conn.close()
+
+    def _connection(self):
+        """One connection per thread and process"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = connect(self.path)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, url, version):
+        """Stored verdict for a normalized URL and model version, or None"""
+        try:
+            row = self._connection().execute(
+                "SELECT verdict, updated_at FROM verdicts WHERE url = ? AND model_version = ?",
+                (url, version)).fetchone()
+        except sqlite3.Error as e:
+            self._error('read', e)
+            return None
+        if row is None or row[1] < time.time() - self.ttl:
+            with self._lock:
+                self.misses += 1
+            return None
+        self._enqueue((TOUCH, (url, version)))
+        with self._lock:
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, url, version, verdict):
+        """Queue a verdict for the next background flush"""
+        try:
+            encoded = json.dumps(verdict, separators=(',', ':'))
+        except (TypeError, ValueError) as e:
+            self._error('encode', e)
+            return
+        self._enqueue((UPSERT, (url, version, encoded, time.time())))
+
+    def hot(self, version, limit):
+        """Up to limit (url, verdict) pairs for a model version, most requested first"""
+        conn = connect(self.path)
+        try:
+            rows = conn.execute(
+                "SELECT url, verdict FROM verdicts WHERE model_version = ? AND updated_at >= ? "
+                "ORDER BY hits DESC LIMIT ?", (version, time.time() - self.ttl, limit)).fetchall()
+        finally:
+            conn.close()
+        return [(url, json.loads(verdict)) for url, verdict in rows]
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                for statement, params in pending:
+                    conn.execute(statement, params)
+            with self._lock:
+                self.writes += len(pending)
+        except sqlite3.Error as e:
+            self._error('write', e)
+
+    def prune(self):
+        """Delete expired verdicts, then the least requested ones above max_rows"""
+        conn = self._connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute("DELETE FROM verdicts WHERE updated_at < ?", (time.time() - self.ttl,))
+            excess = conn.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0] - self.max_rows
+            if excess > 0:
+                conn.execute("DELETE FROM verdicts WHERE rowid IN "
+                             "(SELECT rowid FROM verdicts ORDER BY hits, updated_at LIMIT ?)", (excess,))
+
+    def _enqueue(self, item):
+        self._ensure_writer()
+        with self._lock:
+            # Under a write backlog new verdicts are dropped, never the request
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return
+            self._pending.append(item)
+            if len(self._pending) >= 512:
+                self._wakeup.set()
+
+    def _ensure_writer(self):
+        # Threads do not survive fork, so each worker process starts its own
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pending = []
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='verdict-store', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        next_prune = time.monotonic() + self.prune_interval
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            if time.monotonic() >= next_prune:
+                next_prune = time.monotonic() + self.prune_interval
+                try:
+                    self.prune()
+                except sqlite3.Error as e:
+                    self._error('prune', e)
+
+    def _error(self, operation, error):
+        with self._lock:
+            self.errors += 1
+        logger.error(f"Verdict store {operation} failed: {error}")
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "enabled": True,
+                "path": self.path,
+                "ttl_seconds": self.ttl,
+                "max_rows": self.max_rows,
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "pending": len(self._pending),
+                "dropped": self.dropped,
+                "errors": self.errors
+            }
+        try:
+            stats["file_bytes"] = os.path.getsize(self.path)
+        except OSError:
+            pass
+        return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or prune a verdict store")
+    parser.add_argument('command', choices=['stats', 'prune'])
+    parser.add_argument('path')
+    parser.add_argument('--ttl', type=float, default=7 * 86400)
+    parser.add_argument('--max-rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        print(f"No verdict store at {args.path}", file=sys.stderr)
+        sys.exit(1)
+    store = VerdictStore(args.path, args.ttl, args.max_rows)
+    if args.command == 'prune':
+        store.prune()
+    conn = connect(args.path)
+    versions = conn.execute("SELECT model_version, COUNT(*), SUM(hits) FROM verdicts "
+                            "GROUP BY model_version ORDER BY 2 DESC").fetchall()
+    conn.close()
+    print(json.dumps({
+        "file_bytes": os.path.getsize(args.path),
+        "versions": [{"model_version": v, "verdicts": n, "hits": h} for v, n, h in versions]
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()